@@ -0,0 +1,183 @@
+"""
+Swagger UI and spec endpoints, built on first use.
+flasgger (and its jsonschema/yaml/mistune stack) is only imported when a docs
+URL is requested. The docs run in a small companion Flask app that mirrors
+the main app's routes, so the spec still comes from the route docstrings.
+
+The spec itself is rendered once into SPEC_PATH (by `flask build-apispec`, or
+on first request when the file is missing or the routes changed) and served
+from memory: /apispec.json with an ETag, /apispec/<hash>.json as immutable.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from flask import Flask
+from werkzeug.wrappers import Request, Response
+
+
+SWAGGER_TEMPLATE = {
+    "swagger": "2.0",
+    "info": {
+        "title": "FIFA Arab Cup 2025 API",
+        "description": "RESTful API for managing tournament data including teams, players, and matches",
+        "version": "1.0.0",
+        "contact": {
+            "name": "Mohamed Ayadi",
+            "email": "ayadimed159@gmail.com"
+        }
+    },
+    "securityDefinitions": {
+        "Bearer": {
+            "type": "apiKey",
+            "name": "Authorization",
+            "in": "header",
+            "description": "JWT Authorization header using the Bearer scheme. Example: 'Bearer {token}'"
+        }
+    },
+    "security": [{"Bearer": []}]
+}
+
+SWAGGER_CONFIG = {
+    "headers": [],
+    "specs": [
+        {
+            "endpoint": 'apispec',
+            "route": '/apispec.json',
+            "rule_filter": lambda rule: True,
+            "model_filter": lambda tag: True,
+        }
+    ],
+    "static_url_path": "/flasgger_static",
+    "swagger_ui": True,
+    "specs_route": "/apidocs/"
+}
+
+DOCS_PREFIXES = ('/apidocs', '/apispec', '/flasgger_static', '/oauth2-redirect.html')
+
+SPEC_ROUTE = '/apispec.json'
+SPEC_PATH = os.getenv(
+    "APISPEC_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'apispec.json'),
+)
+SPEC_MAX_AGE = int(os.getenv("APISPEC_MAX_AGE", "300"))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def build_docs_app(app, spec_route=SPEC_ROUTE):
+    """Create a Flask app serving flasgger for the routes registered on app"""
+    from flasgger import Swagger
+    from flask_cors import CORS
+
+    docs = Flask(app.import_name)
+    docs.config.update(app.config)
+    CORS(docs)
+    config = dict(SWAGGER_CONFIG, specs=[dict(spec, route=spec_route) for spec in SWAGGER_CONFIG['specs']])
+    Swagger(docs, template=SWAGGER_TEMPLATE, config=config)
+
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint in docs.view_functions:
+            continue
+        docs.add_url_rule(
+            rule.rule, rule.endpoint, app.view_functions[rule.endpoint],
+            methods=rule.methods, defaults=rule.defaults,
+        )
+    return docs
+
+
+def routes_fingerprint(app):
+    """Cheap hash of everything the spec is rendered from (rules, methods, docstrings)"""
+    digest = hashlib.sha256(json.dumps(SWAGGER_TEMPLATE, sort_keys=True).encode('utf-8'))
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: (r.rule, r.endpoint)):
+        view = app.view_functions[rule.endpoint]
+        digest.update(f"{rule.rule}|{rule.endpoint}|{sorted(rule.methods)}|{view.__doc__ or ''}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ApiSpec:
+    """Serialized spec bytes plus the content hash used for the ETag and the immutable URL"""
+
+    def __init__(self, spec):
+        self.body = json.dumps(spec, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        self.hash = hashlib.sha256(self.body).hexdigest()[:16]
+
+    @property
+    def url(self):
+        return f"/apispec/{self.hash}.json"
+
+
+def write_spec(app, path=SPEC_PATH):
+    """Render the spec with flasgger and store it with the routes fingerprint"""
+    docs = build_docs_app(app)
+    spec = docs.test_client().get(SPEC_ROUTE).get_json()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': routes_fingerprint(app), 'spec': spec}, f)
+    os.replace(tmp, path)
+    return ApiSpec(spec)
+
+
+def load_spec(app, path=SPEC_PATH):
+    """Read the prebuilt spec, re-rendering it when missing or built from different routes"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('fingerprint') == routes_fingerprint(app):
+            return ApiSpec(stored['spec'])
+    except (OSError, ValueError):
+        pass
+    return write_spec(app, path)
+
+
+class LazyApiDocs:
+    """WSGI middleware serving the prebuilt spec, and the rest of the docs from an app built on first use"""
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self._spec = None
+        self._docs = None
+        self._lock = threading.Lock()
+
+    def spec(self):
+        if self._spec is None:
+            with self._lock:
+                if self._spec is None:
+                    self._spec = load_spec(self.app)
+        return self._spec
+
+    def docs_app(self):
+        if self._docs is None:
+            spec = self.spec()
+            with self._lock:
+                if self._docs is None:
+                    # The UI fetches the immutable URL, which this middleware answers
+                    self._docs = build_docs_app(self.app, spec_route=spec.url)
+        return self._docs
+
+    def spec_response(self, request):
+        spec = self.spec()
+        if request.path not in (SPEC_ROUTE, spec.url):
+            # A page cached before the spec changed asks for an old hash
+            response = Response(status=302, headers={'Location': spec.url})
+        else:
+            response = Response(spec.body, mimetype='application/json')
+            response.set_etag(spec.hash)
+            response.headers['Cache-Control'] = (
+                IMMUTABLE if request.path == spec.url else f'public, max-age={SPEC_MAX_AGE}'
+            )
+            response = response.make_conditional(request)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == SPEC_ROUTE or (path.startswith('/apispec/') and path.endswith('.json')):
+            return self.spec_response(Request(environ))(environ, start_response)
+        if path.startswith(DOCS_PREFIXES):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
@@ -1,11 +1,14 @@
-from flask import Flask, send_from_directory
+import click
+from flask import Flask, abort, request
 from flask_cors import CORS
-from flasgger import Swagger
 from dotenv import load_dotenv
 import os
 
+from api_docs import LazyApiDocs
+from compression import compress_response
 from extensions import db
-from services.clean_csv_import import clean_import_from_csv
+from json_provider import ApiJSONProvider, OrjsonProvider
+from static_assets import StaticManifest
 
 load_dotenv()
 
@@ -19,45 +22,14 @@ def create_app():
     db.init_app(app)
     CORS(app)
 
-    # Swagger Configuration
-    swagger_template = {
-        "swagger": "2.0",
-        "info": {
-            "title": "FIFA Arab Cup 2025 API",
-            "description": "RESTful API for managing tournament data including teams, players, and matches",
-            "version": "1.0.0",
-            "contact": {
-                "name": "Mohamed Ayadi",
-                "email": "ayadimed159@gmail.com"
-            }
-        },
-        "securityDefinitions": {
-            "Bearer": {
-                "type": "apiKey",
-                "name": "Authorization",
-                "in": "header",
-                "description": "JWT Authorization header using the Bearer scheme. Example: 'Bearer {token}'"
-            }
-        },
-        "security": [{"Bearer": []}]
-    }
-
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": 'apispec',
-                "route": '/apispec.json',
-                "rule_filter": lambda rule: True,
-                "model_filter": lambda tag: True,
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/apidocs/"
-    }
-
-    Swagger(app, template=swagger_template, config=swagger_config)
+    # orjson when installed, otherwise Flask's stdlib json; both negotiate MessagePack
+    app.json = (OrjsonProvider or ApiJSONProvider)(app)
+
+    # gzip/brotli for responses that are not pre-compressed
+    app.after_request(lambda response: compress_response(response, request))
+
+    # Swagger UI and /apispec.json load flasgger on first use
+    app.wsgi_app = LazyApiDocs(app, app.wsgi_app)
 
     # IMPORTANT: Register blueprints BEFORE catch-all route
     # This ensures API routes take precedence over frontend
@@ -67,6 +39,7 @@ def create_app():
     from routes.auth import auth_bp
     from routes.leaderboards import leaderboards_bp
     from routes.statistics import statistics_bp
+    from routes.live import live_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(players_bp)
@@ -74,9 +47,12 @@ def create_app():
     app.register_blueprint(leaderboards_bp)
     app.register_blueprint(statistics_bp)
     app.register_blueprint(matches_bp)
+    app.register_blueprint(live_bp)
 
     # Serve frontend files (registered LAST so API routes take precedence)
     frontend_folder = os.path.join(os.path.dirname(__file__), 'frontend')
+    # Indexed, hashed and compressed once; requests never touch the filesystem
+    frontend = StaticManifest(frontend_folder)
     
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -85,28 +61,104 @@ def create_app():
         if path.startswith('api/') or path.startswith('apidocs') or path.startswith('apispec'):
             # Return empty 404 so the routing continues to find blueprint routes
             return '', 404
-        if path and os.path.exists(os.path.join(frontend_folder, path)):
-            return send_from_directory(frontend_folder, path)
-        return send_from_directory(frontend_folder, 'index.html')
+        asset, immutable = frontend.lookup(path or 'index.html')
+        if asset is None:
+            abort(404)
+        return asset.response(request, immutable)
 
     with app.app_context():
-        from models import Match, Team
+        from models import Match, MatchGoal, Standing, Team, TeamRating
         db.create_all()
 
+        # create_all never alters existing tables; add columns/indexes introduced since
+        from schema_upgrade import upgrade_schema
+        for change in upgrade_schema():
+            print(f"🔧 Schema upgrade: {change}")
+
+        # Standings added to a database that already holds results start empty
+        if Standing.query.count() == 0 and Match.query.filter(Match.home_score.isnot(None)).count():
+            from services.standings_service import rebuild_standings
+            rebuild_standings()
+
+        # Likewise rating checkpoints; replayed from the results already stored
+        if TeamRating.query.count() == 0 and Match.query.filter(Match.home_score.isnot(None)).count():
+            from services.rating_service import rebuild_ratings
+            rebuild_ratings()
+
+        # match_goals is new too; its rows come from the goal minutes in matches.csv
+        if MatchGoal.query.count() == 0 and Match.query.count():
+            from services.clean_csv_import import CleanCSVImport
+            goals = CleanCSVImport().backfill_goal_timings()
+            if goals:
+                print(f"🔧 Schema upgrade: backfilled {goals} goal timings")
+
         # Auto-import CSV data into the database if empty
         try:
             if Team.query.count() == 0:
+                from services.clean_csv_import import clean_import_from_csv
                 clean_import_from_csv()
         except Exception as exc:
             print(f"⚠️  Auto-import skipped due to error: {exc}")
+
+    # Periodic SportsDB sync (off unless SPORTSDB_SYNC_INTERVAL is set).
+    # A preforking server starts it in each worker after fork instead.
+    if not os.getenv("DEFER_BACKGROUND_THREADS"):
+        from services.sync_scheduler import start_scheduler
+        start_scheduler(app)
     
     # Register Flask CLI commands
     @app.cli.command("clean-import")
     def clean_import_command():
         """Clean import: Clear all data and import fresh from CSV (all players per team)"""
+        from services.clean_csv_import import clean_import_from_csv
         clean_import_from_csv()
         print("✅ Clean import complete!")
     
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """Add columns and indexes missing from tables created by an older version"""
+        from schema_upgrade import upgrade_schema
+        changes = upgrade_schema()
+        for change in changes:
+            print(f"🔧 {change}")
+        print(f"✅ Schema up to date ({len(changes)} changes)")
+    
+    @app.cli.command("build-apispec")
+    def build_apispec_command():
+        """Render the OpenAPI spec from the route docstrings into data/apispec.json"""
+        from api_docs import SPEC_PATH, write_spec
+        spec = write_spec(app)
+        print(f"✅ Spec written to {SPEC_PATH} ({len(spec.body)} bytes, hash {spec.hash})")
+    
+    @app.cli.command("snapshot-state")
+    def snapshot_state_command():
+        """Snapshot team/player/match aggregates at the current event log position"""
+        from services.event_log_service import take_snapshot
+        path = take_snapshot()
+        print(f"✅ Snapshot written to {path}")
+    
+    @app.cli.command("recover-state")
+    def recover_state_command():
+        """Restore the latest snapshot and replay the event log tail"""
+        from services.event_log_service import recover
+        result = recover()
+        print(f"✅ Recovered from snapshot #{result['snapshot_seq']}: "
+              f"{result['replayed']} events replayed, {result['skipped']} skipped")
+    
+    @app.cli.command("sync-sportsdb")
+    @click.option("--full", is_flag=True, help="Fetch the whole season instead of events after the last completed matchday")
+    def sync_sportsdb_command(full):
+        """Refresh teams, squads and matches from TheSportsDB"""
+        from services.sync_scheduler import run_sync
+        result = run_sync(incremental=not full)
+        if result is None:
+            print("⏳ Another sync is already running")
+            return
+        print(f"✅ Synced {result['teams']} teams, {result['players']} new players, "
+              f"{result['matches']} new matches (matchday cursor: {result['cursor']})")
+        for team_api_id, message in result['errors'].items():
+            print(f"   ⚠️  team {team_api_id}: {message}")
+    
     @app.cli.command("seed-users")
     def seed_users_command():
         """Seed default users for login"""
@@ -0,0 +1,74 @@
+"""
+Startup import regression check.
+
+    python benchmarks/check_import_budget.py [--budget-ms 1000]
+
+Imports the app in a fresh interpreter under `python -X importtime` and fails
+(exit 1) when a module that should load lazily is imported at startup, or when
+the total import time of `app` exceeds the budget.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy packages that must only load on first use
+DEFERRED_MODULES = ('pandas', 'flasgger', 'requests', 'services.clean_csv_import', 'services.sportsdb_service')
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure():
+    env = dict(os.environ)
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "import_budget.db")
+    env.setdefault("SECRET_KEY", "import-budget-check")
+
+    # Run twice so the measured import does not include the first-run CSV import's bytecode compilation
+    for _ in range(2):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    args = parser.parse_args()
+
+    modules = measure()
+    total_ms = modules.get("app", 0) / 1000
+    eager = [name for name in DEFERRED_MODULES if name in modules]
+
+    print(f"import app: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in sorted(modules.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: startup import time over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
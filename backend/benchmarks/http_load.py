@@ -0,0 +1,87 @@
+"""
+Minimal closed-loop HTTP load generator (standard library only).
+
+    python benchmarks/http_load.py --url http://127.0.0.1:5000 \
+        --path /api/teams/ --path /api/leaderboards/standings -c 16 -d 20
+
+Each of the -c client threads keeps one keep-alive connection and issues
+requests back to back, cycling through the paths, for -d seconds.
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def _client(host, port, paths, headers, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    i = 0
+    while time.perf_counter() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def run(url, paths, concurrency, duration, headers=None):
+    parsed = urlparse(url)
+    latencies = []
+    errors = []
+    stop_at = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(parsed.hostname, parsed.port or 80, paths, headers or {},
+                                               stop_at, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'req_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--header", action="append", default=[], help="Extra header, 'Name: value'")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    headers = dict(h.split(":", 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+    result = run(args.url, args.paths or ["/api/teams/"], args.concurrency, args.duration, headers)
+    print(" ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
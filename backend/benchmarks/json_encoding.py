@@ -0,0 +1,81 @@
+"""
+Per-endpoint JSON encoding benchmark.
+
+    python benchmarks/json_encoding.py [-n 200]
+
+Builds each hot endpoint's payload once, then times serializing it with
+Flask's stdlib-json provider, with the orjson provider, as MessagePack, and
+a pre-encoded cache hit (cached_json), which only wraps stored bytes in a
+response.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.environ.get("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "json_bench.db")
+os.environ.setdefault("SECRET_KEY", "json-encoding-benchmark")
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import app  # noqa: E402
+from json_provider import OrjsonProvider, cached_json, encode_msgpack, msgpack  # noqa: E402
+from services.comparison_service import get_comparison_matrix_payload  # noqa: E402
+from services.db_data_service import get_all_matches, get_all_players, get_all_teams, get_team_analytics  # noqa: E402
+from services.standings_service import OVERALL_STAGE, get_stages, get_standings_table  # noqa: E402
+
+
+ENDPOINTS = {
+    "/api/players/": get_all_players,
+    "/api/teams/": get_all_teams,
+    "/api/matches/": get_all_matches,
+    "/api/leaderboards/standings": lambda: {
+        "stage": OVERALL_STAGE,
+        "stages": get_stages(),
+        "standings": get_standings_table(OVERALL_STAGE),
+    },
+    "/api/statistics/teams/analytics": lambda: {"teams": get_team_analytics()},
+    "/api/statistics/comparison-matrix": get_comparison_matrix_payload,
+}
+
+
+def _time_us(f, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        f()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=200, help="iterations per measurement")
+    args = parser.parse_args()
+
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app) if OrjsonProvider is not None else None
+    if fast is None:
+        print("orjson is not installed; only the stdlib provider is measured")
+
+    if msgpack is None:
+        print("msgpack is not installed; MessagePack is not measured")
+
+    print(f"{'endpoint':36} {'bytes':>8} {'stdlib us':>10} {'orjson us':>10} {'msgpack us':>10} {'cached us':>10}")
+    with app.test_request_context():
+        for path, build in ENDPOINTS.items():
+            payload = build()
+            size = len(stdlib.dumps(payload))
+            stdlib_us = _time_us(lambda: stdlib.response(payload), args.n)
+            fast_us = _time_us(lambda: fast.response(payload), args.n) if fast else float("nan")
+            msgpack_us = _time_us(lambda: encode_msgpack(payload), args.n) if msgpack else float("nan")
+            cached_json(path, build)  # warm the entry
+            cached_us = _time_us(lambda: cached_json(path, build), args.n)
+            print(f"{path:36} {size:8d} {stdlib_us:10.1f} {fast_us:10.1f} {msgpack_us:10.1f} {cached_us:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Response compression helpers shared by the static asset and API layers.
+Brotli is optional; without the package only gzip variants are produced.
+"""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency: gzip only
+    brotli = None
+
+
+# Bodies smaller than this are not worth the Content-Encoding overhead
+MIN_COMPRESS_SIZE = 512
+
+# Preference order when the client rates several encodings equally
+ENCODINGS = ('br', 'gzip')
+
+# API bodies cached per data generation are compressed once, so they can afford
+# higher levels than bodies compressed on every request. Brotli 11 is reserved
+# for static assets: it costs about a second on the full player list.
+CACHED_LEVELS = {'gzip_level': 9, 'brotli_quality': 9}
+PER_REQUEST_LEVELS = {'gzip_level': 6, 'brotli_quality': 4}
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/javascript', 'image/svg+xml')
+
+
+def compress(body, encoding, gzip_level=9, brotli_quality=11):
+    """Compress body with one of ENCODINGS"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def compress_stream(chunks, encoding, gzip_level=6, brotli_quality=4):
+    """Compress an iterable of byte chunks incrementally, flushing after each one"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield compressor.flush()
+
+
+def available_encodings():
+    return ENCODINGS if brotli is not None else ('gzip',)
+
+
+def compress_variants(body, min_size=MIN_COMPRESS_SIZE, gzip_level=9, brotli_quality=11):
+    """Return {encoding: bytes} for every encoding that actually shrinks body"""
+    variants = {}
+    if len(body) < min_size:
+        return variants
+
+    for encoding in available_encodings():
+        compressed = compress(body, encoding, gzip_level, brotli_quality)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+def negotiate_encoding(accept_encodings, available):
+    """
+    Pick the client's highest-rated encoding among those available, or None
+    for the identity body. accept_encodings is werkzeug's parsed Accept-Encoding.
+    """
+    best = None
+    best_quality = 0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response, request, min_size=MIN_COMPRESS_SIZE):
+    """
+    after_request hook compressing eligible response bodies on the fly.
+    Responses that already negotiated Accept-Encoding themselves (pre-encoded
+    API bodies, static assets) and streamed responses are left untouched.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or 'accept-encoding' in response.vary
+        or not (response.mimetype.startswith('text/') or response.mimetype in COMPRESSIBLE_MIMETYPES)
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings, available_encodings())
+    if encoding is None:
+        return response
+
+    compressed = compress(body, encoding, **PER_REQUEST_LEVELS)
+    if len(compressed) >= len(body):
+        return response
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
@@ -0,0 +1,94 @@
+"""
+Production server configuration: gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app), which also runs the
+CSV auto-import and warms the computed caches. Forked workers then share those
+pages copy-on-write instead of each loading pandas, the CSVs and the caches.
+
+Signals (sent to the master):
+- HUP: start fresh workers and gracefully stop the old ones. Config changes
+  are picked up; with preload_app the application code is not re-imported,
+  so deploy code changes with a full restart.
+- TERM: graceful shutdown. TTIN/TTOU: add/remove a worker.
+
+The SSE endpoint (/api/live/stream) would hold a worker thread per connected
+client here, so streams are served by the gevent server in
+gunicorn_sse.conf.py instead; set LIVE_STREAM_URL to its public address and
+this server redirects stream requests to it.
+"""
+
+import gc
+import multiprocessing
+import os
+
+
+# Background threads started while importing the app would die at fork;
+# post_fork starts them in every worker instead.
+os.environ.setdefault("DEFER_BACKGROUND_THREADS", "1")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+preload_app = True
+
+# Recycle workers to bound slow memory growth; jitter avoids restarting them all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def _warm_caches(app):
+    """Compute the shared read-mostly payloads once, before any worker exists"""
+    from services.csv_data_service import CSVDataService
+    from services.comparison_service import get_comparison_matrix_payload
+    from services.db_data_service import get_team_analytics
+    from services.percentile_service import POSITION_CATEGORIES, load_player_metric_table
+    from services.similarity_service import get_similarity_index
+
+    with app.app_context():
+        CSVDataService.load_teams()
+        CSVDataService.load_players()
+        CSVDataService.load_matches()
+        CSVDataService.load_league()
+        get_team_analytics()
+        get_comparison_matrix_payload()
+        load_player_metric_table()
+        for category in POSITION_CATEGORIES:
+            get_similarity_index(category)
+
+    # Prebuilt OpenAPI spec bytes (app.wsgi_app is the LazyApiDocs middleware)
+    app.wsgi_app.spec()
+
+
+def when_ready(server):
+    from extensions import db
+
+    app = server.app.wsgi()
+    try:
+        _warm_caches(app)
+    except Exception as exc:
+        server.log.warning("Cache warm-up skipped: %s", exc)
+    finally:
+        with app.app_context():
+            db.session.remove()
+            # Connections opened in the master must not be shared by the workers
+            db.engine.dispose()
+
+    # Keep the warmed objects out of the collector so GC passes in the
+    # workers do not write to (and un-share) their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from services.sync_scheduler import start_scheduler
+
+    start_scheduler(server.app.wsgi())
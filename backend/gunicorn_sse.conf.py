@@ -0,0 +1,39 @@
+"""
+Live stream server configuration: gunicorn -c gunicorn_sse.conf.py app:app
+
+Serves /api/live/stream next to the API server (gunicorn.conf.py), which
+redirects stream requests here when LIVE_STREAM_URL is set. gevent workers
+hold each connected client as a greenlet instead of a thread, so one worker
+keeps thousands of streams open. Event ids are data generations, stored in the
+database, so clients resume across workers and restarts.
+
+The app is not preloaded: gevent patches the standard library when a worker
+starts, and the app (with its broadcaster thread) must be imported after that.
+No sync scheduler runs here; the API server owns the SportsDB sync.
+"""
+
+import os
+
+
+# This server answers streams itself instead of redirecting them
+os.environ.pop("LIVE_STREAM_URL", None)
+# Keeps the sync scheduler from starting when the app is imported
+os.environ.setdefault("DEFER_BACKGROUND_THREADS", "1")
+
+bind = f"0.0.0.0:{os.getenv('LIVE_STREAM_PORT', '5001')}"
+
+workers = int(os.getenv("LIVE_STREAM_WORKERS", "1"))
+worker_class = "gevent"
+worker_connections = int(os.getenv("LIVE_STREAM_CONNECTIONS", "2000"))
+
+preload_app = False
+
+# Streams never finish, so recycling would drop every client of a worker
+max_requests = 0
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
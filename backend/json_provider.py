@@ -0,0 +1,249 @@
+"""
+JSON encoding for API responses.
+OrjsonProvider replaces Flask's stdlib-json provider when orjson is
+installed; output keeps Flask's conventions (sorted keys, compact separators,
+HTTP dates for datetimes, trailing newline). cached_json() stores a payload
+already encoded per data generation, so a cache hit reuses the same bytes;
+its gzip/brotli variants are built on first request and cached with it.
+stream_json() writes a collection item by item, as a JSON array or NDJSON.
+
+When msgpack is installed, every JSON response (jsonify, cached_json,
+stream_json) is negotiated: Accept: application/msgpack gets the same
+payload encoded as MessagePack.
+"""
+
+import hashlib
+
+from flask import current_app, has_request_context, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+from compression import (
+    CACHED_LEVELS, MIN_COMPRESS_SIZE, PER_REQUEST_LEVELS,
+    available_encodings, compress_stream, compress_variants, negotiate_encoding,
+)
+from services.cache_service import get_cached
+
+try:
+    import orjson
+except ImportError:  # optional dependency: stdlib json via Flask's default provider
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency: JSON only
+    msgpack = None
+
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Row layouts offered by the large list endpoints (?layout=)
+LAYOUTS = ('rows', 'columns')
+
+
+def _default(o):
+    # numpy scalars and arrays from the analytics services
+    if hasattr(o, 'tolist'):
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+def wants_msgpack():
+    """True when msgpack is installed and the client prefers it over JSON"""
+    if msgpack is None or not has_request_context():
+        return False
+    return request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+
+def encode_msgpack(obj):
+    # Same conversions as JSON for types msgpack has no native form for (datetimes, numpy)
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def msgpack_response(obj):
+    response = current_app.response_class(encode_msgpack(obj), mimetype=MSGPACK_MIMETYPE)
+    response.vary.add('Accept')
+    return response
+
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, answering jsonify() with MessagePack when the client asks for it"""
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if wants_msgpack():
+            return msgpack_response(obj)
+        response = self._json_response(obj)
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+    def _json_response(self, obj):
+        return super().response(obj)
+
+
+if orjson is not None:
+    class OrjsonProvider(ApiJSONProvider):
+        """Flask JSON provider backed by orjson"""
+
+        OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+        def dumps_bytes(self, obj, indent=False):
+            option = self.OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, default=_default, option=option)
+
+        def dumps(self, obj, **kwargs):
+            return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def _json_response(self, obj):
+            indent = self.compact is False or (self.compact is None and self._app.debug)
+            return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+else:
+    OrjsonProvider = None
+
+# Items encoded per chunk written to the socket when streaming
+STREAM_CHUNK_ITEMS = 200
+
+
+def _dumps_bytes(obj):
+    provider = current_app.json
+    if hasattr(provider, 'dumps_bytes'):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode('utf-8')
+
+
+def encode_json(obj):
+    """Encode obj the way the app's provider would for a response body"""
+    return _dumps_bytes(obj) + b"\n"
+
+
+def to_columns(rows):
+    """
+    Arrays-of-columns layout for a list of flat dicts: one list of values per
+    key, in row order. Keys missing from a row get None.
+    """
+    keys = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+    return {
+        'count': len(rows),
+        'columns': {key: [row.get(key) for row in rows] for key in keys},
+    }
+
+
+def apply_layout(rows, layout):
+    return to_columns(rows) if layout == 'columns' else rows
+
+
+def wants_ndjson():
+    """True when the client prefers NDJSON over JSON (a bare */* gets JSON)"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _encoded_batches(items):
+    batch = []
+    for item in items:
+        batch.append(_dumps_bytes(item))
+        if len(batch) >= STREAM_CHUNK_ITEMS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _json_array_chunks(items):
+    lead = b"["
+    for batch in _encoded_batches(items):
+        yield lead + b",".join(batch)
+        lead = b","
+    yield (b"[]" if lead == b"[" else b"]") + b"\n"
+
+
+def _ndjson_chunks(items):
+    for batch in _encoded_batches(items):
+        yield b"\n".join(batch) + b"\n"
+
+
+def stream_json(items, ndjson=False):
+    """
+    Streamed response for an iterable of JSON-serializable items: one JSON
+    array, or one item per line with ndjson. Items are encoded as they are
+    produced, so the first bytes go out before the collection is read.
+    The stream is compressed on the fly when the client accepts it.
+    MessagePack clients get a single packed array instead of a stream.
+    """
+    if wants_msgpack():
+        return msgpack_response(list(items))
+
+    body = _ndjson_chunks(items) if ndjson else _json_array_chunks(items)
+    encoding = negotiate_encoding(request.accept_encodings, available_encodings())
+    if encoding:
+        body = compress_stream(body, encoding, **PER_REQUEST_LEVELS)
+
+    response = current_app.response_class(
+        stream_with_context(body), mimetype=NDJSON_MIMETYPE if ndjson else 'application/json'
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response
+
+
+class EncodedJSON:
+    """A response body encoded once, with its ETag, compressed variants and MessagePack form"""
+
+    def __init__(self, payload):
+        self.body = encode_json(payload)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:16]
+        self._variants = None
+        self._msgpack = None
+
+    @property
+    def msgpack(self):
+        # Packed from the JSON body, so both formats carry exactly the same data
+        if self._msgpack is None:
+            self._msgpack = encode_msgpack(current_app.json.loads(self.body))
+        return self._msgpack
+
+    @property
+    def variants(self):
+        # Compressed on first use: clients that never ask for an encoding pay nothing
+        if self._variants is None:
+            self._variants = compress_variants(self.body, **CACHED_LEVELS)
+        return self._variants
+
+    def response(self):
+        if wants_msgpack():
+            response = current_app.response_class(self.msgpack, mimetype=MSGPACK_MIMETYPE)
+            response.vary.add('Accept')
+            response.set_etag(f"{self.etag}-msgpack")
+            return response.make_conditional(request)
+
+        compressible = len(self.body) >= MIN_COMPRESS_SIZE
+        encoding = None
+        if compressible and request.accept_encodings:
+            encoding = negotiate_encoding(request.accept_encodings, self.variants)
+        response = current_app.response_class(
+            self.variants[encoding] if encoding else self.body, mimetype='application/json'
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if compressible:
+            response.vary.add('Accept-Encoding')
+        if msgpack is not None:
+            response.vary.add('Accept')
+        response.set_etag(f"{self.etag}-{encoding}" if encoding else self.etag)
+        return response.make_conditional(request)
+
+
+def cached_json(name, compute, *args):
+    """
+    Response for compute(*args), encoded once per data generation.
+    Only use for payloads that change exclusively through bump_generation().
+    """
+    return get_cached(('json', name, args), lambda: EncodedJSON(compute(*args))).response()
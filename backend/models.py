@@ -2,10 +2,15 @@ from extensions import db
 
 class Match(db.Model):
     __tablename__ = "matches"
+    __table_args__ = (
+        db.Index("ix_matches_pair", "pair_low_team_id", "pair_high_team_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.String(50), unique=True, nullable=False)
     season = db.Column(db.String(20))
+    # Group or round label ("Group A"); matches without one only count toward the overall table
+    stage = db.Column(db.String(50))
 
     date = db.Column(db.String(50))
 
@@ -19,6 +24,34 @@ class Match(db.Model):
     away_score = db.Column(db.Integer)
     venue = db.Column(db.String(100))
 
+    # Unordered team pair (min id, max id) so head-to-head lookups hit one index
+    pair_low_team_id = db.Column(db.Integer)
+    pair_high_team_id = db.Column(db.Integer)
+
+    def update_pair_key(self):
+        """Recalculate the unordered team pair key"""
+        if self.home_team_id and self.away_team_id:
+            self.pair_low_team_id = min(self.home_team_id, self.away_team_id)
+            self.pair_high_team_id = max(self.home_team_id, self.away_team_id)
+        else:
+            self.pair_low_team_id = None
+            self.pair_high_team_id = None
+        return self
+
+class MatchGoal(db.Model):
+    __tablename__ = "match_goals"
+    __table_args__ = (
+        db.Index("ix_match_goals_team_minute", "team_id", "minute"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False, index=True)
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False)
+
+    # "45'2" is stored as minute 45 with 2 minutes of added time
+    minute = db.Column(db.SmallInteger, nullable=False)
+    added_time = db.Column(db.SmallInteger, default=0)
+
 class Team(db.Model):
     __tablename__ = "teams"
 
@@ -139,6 +172,96 @@ class TeamStatistics(db.Model):
         return self
 
 
+class Standing(db.Model):
+    __tablename__ = "standings"
+    __table_args__ = (
+        db.UniqueConstraint("stage", "team_id", name="uq_standings_stage_team"),
+        db.Index("ix_standings_stage_position", "stage", "position"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    stage = db.Column(db.String(50), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False)
+    position = db.Column(db.Integer)
+
+    played = db.Column(db.Integer, default=0)
+    wins = db.Column(db.Integer, default=0)
+    draws = db.Column(db.Integer, default=0)
+    losses = db.Column(db.Integer, default=0)
+    goals_for = db.Column(db.Integer, default=0)
+    goals_against = db.Column(db.Integer, default=0)
+    clean_sheets = db.Column(db.Integer, default=0)
+    goal_difference = db.Column(db.Integer, default=0)
+    points = db.Column(db.Integer, default=0)
+
+    team = db.relationship("Team")
+
+    def calculate_metrics(self):
+        """Recalculate derived columns"""
+        self.goal_difference = (self.goals_for or 0) - (self.goals_against or 0)
+        self.points = (self.wins or 0) * 3 + (self.draws or 0)
+        return self
+
+
+class TeamRating(db.Model):
+    __tablename__ = "team_ratings"
+    __table_args__ = (
+        db.UniqueConstraint("team_id", "sequence", name="uq_team_ratings_team_sequence"),
+        db.UniqueConstraint("team_id", "match_id", name="uq_team_ratings_team_match"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False)
+    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False)
+    opponent_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
+
+    # Per-team match counter; the highest sequence holds the current rating
+    sequence = db.Column(db.Integer, nullable=False)
+    played_at = db.Column(db.DateTime)
+
+    rating_before = db.Column(db.Float, nullable=False)
+    rating_after = db.Column(db.Float, nullable=False)
+
+
+class SyncState(db.Model):
+    """Per-resource memory of the SportsDB sync; the 'scheduler' row also holds the runner lease"""
+    __tablename__ = "sync_state"
+
+    id = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(100), unique=True, nullable=False)
+
+    last_run_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_payload_hash = db.Column(db.String(64))
+    # Date (YYYY-MM-DD) of the last matchday whose matches are all completed
+    cursor = db.Column(db.String(20))
+    last_error = db.Column(db.Text)
+
+    locked_by = db.Column(db.String(255))
+    locked_until = db.Column(db.DateTime)
+
+    # JSON circuit breaker state and counters, on the 'breaker' row
+    breaker_state = db.Column(db.Text)
+
+    @classmethod
+    def get(cls, resource):
+        """Return the state row for a resource, creating it if missing"""
+        state = cls.query.filter_by(resource=resource).first()
+        if not state:
+            state = cls(resource=resource)
+            db.session.add(state)
+            db.session.flush()
+        return state
+
+
+class DataGeneration(db.Model):
+    """Single-row data generation counter shared by every process and host"""
+    __tablename__ = "data_generation"
+
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -1,8 +1,24 @@
 from flask import Blueprint, jsonify, request
-from services.db_data_service import get_leaderboard, get_all_teams
+from json_provider import cached_json
+from services.db_data_service import get_leaderboard
+from services.standings_service import OVERALL_STAGE, get_stages, get_standings_table
 
 leaderboards_bp = Blueprint("leaderboards", __name__, url_prefix="/api/leaderboards")
 
+# Leaderboard sizes worth keeping encoded; larger ones are built per request
+MAX_CACHED_LIMIT = 100
+
+
+def _leaderboard_payload(metric, limit, player_type=None):
+    return {"leaderboard": get_leaderboard(metric, limit=limit, player_type=player_type)}
+
+
+def _leaderboard_response(metric, limit, player_type=None):
+    """Leaderboard response, pre-encoded for the usual (small, positive) limits"""
+    if 0 < limit <= MAX_CACHED_LIMIT:
+        return cached_json('leaderboard', _leaderboard_payload, metric, limit, player_type)
+    return jsonify(_leaderboard_payload(metric, limit, player_type))
+
 
 @leaderboards_bp.route("/top-scorers", methods=["GET"])
 def get_top_scorers():
@@ -42,8 +58,7 @@ def get_top_scorers():
                     type: string
     """
     limit = request.args.get('limit', 10, type=int)
-    leaderboard = get_leaderboard('goals_overall', limit=limit)
-    return jsonify({"leaderboard": leaderboard})
+    return _leaderboard_response('goals_overall', limit)
 
 
 @leaderboards_bp.route("/top-assists", methods=["GET"])
@@ -84,8 +99,7 @@ def get_top_assists():
                     type: string
     """
     limit = request.args.get('limit', 10, type=int)
-    leaderboard = get_leaderboard('assists_overall', limit=limit)
-    return jsonify({"leaderboard": leaderboard})
+    return _leaderboard_response('assists_overall', limit)
 
 
 @leaderboards_bp.route("/top-defenders", methods=["GET"])
@@ -128,8 +142,7 @@ def get_top_defenders():
                     type: string
     """
     limit = request.args.get('limit', 10, type=int)
-    leaderboard = get_leaderboard('tackles_per_90_overall', limit=limit, player_type='Defender')
-    return jsonify({"leaderboard": leaderboard})
+    return _leaderboard_response('tackles_per_90_overall', limit, player_type='Defender')
 
 
 @leaderboards_bp.route("/standings", methods=["GET"])
@@ -137,17 +150,33 @@ def get_standings():
     """
     Get Team Standings from Database
     
-    Loads team standings from database, sorted by points/performance.
-    Includes team performance metrics (wins, draws, losses, goals, clean sheets).
+    Reads a standings table maintained from match results. Teams are ranked by
+    points, goal difference and goals scored, then by their head-to-head
+    record among teams still level.
+    
+    Query Parameters:
+    - stage: Table to return (overall by default, or a group/round label)
     ---
     tags:
       - Leaderboards
+    parameters:
+      - name: stage
+        in: query
+        type: string
+        default: overall
+        example: Group A
     responses:
       200:
-        description: Team standings from CSV
+        description: Team standings computed from match results
         schema:
           type: object
           properties:
+            stage:
+              type: string
+            stages:
+              type: array
+              items:
+                type: string
             standings:
               type: array
               items:
@@ -169,32 +198,27 @@ def get_standings():
                     type: integer
                   goals_conceded:
                     type: integer
+                  goal_difference:
+                    type: integer
                   clean_sheets:
                     type: integer
+                  points:
+                    type: integer
+      404:
+        description: Unknown stage
     """
-    teams = get_all_teams()
+    stage = request.args.get('stage', OVERALL_STAGE)
+    stages = get_stages()
     
-    # Sort by wins (descending) and points
-    sorted_teams = sorted(
-        teams,
-        key=lambda t: (t.get('wins', 0), t.get('points', 0)),
-        reverse=True
-    )
+    if stage not in stages and stage != OVERALL_STAGE:
+        return jsonify({"error": f"Stage '{stage}' not found"}), 404
     
-    standings = []
-    for idx, team in enumerate(sorted_teams, 1):
-        standings.append({
-            'position': idx,
-            'country': team.get('country'),
-            'name': team.get('name'),
-            'matches_played': team.get('matches_played', 0),
-            'wins': team.get('wins', 0),
-            'draws': team.get('draws', 0),
-            'losses': team.get('losses', 0),
-            'goals_scored': team.get('goals_scored', 0),
-            'goals_conceded': team.get('goals_conceded', 0),
-            'clean_sheets': team.get('clean_sheets', 0),
-            'points': team.get('points', 0),
-        })
-    
-    return jsonify({"standings": standings})
+    return cached_json('standings', _standings_payload, stage)
+
+
+def _standings_payload(stage):
+    return {
+        "stage": stage,
+        "stages": get_stages(),
+        "standings": get_standings_table(stage),
+    }
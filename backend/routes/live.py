@@ -0,0 +1,220 @@
+import os
+
+from flask import Blueprint, Response, current_app, jsonify, redirect, request
+from auth_utils import token_required
+from services.live_ingestion_service import ingest_match_result, ingest_match_event, IngestionError
+from services.live_stream_service import broadcaster
+
+live_bp = Blueprint("live", __name__, url_prefix="/api/live")
+
+# Set when streams are served by the separate gevent server (gunicorn_sse.conf.py)
+LIVE_STREAM_URL = os.getenv("LIVE_STREAM_URL")
+
+
+@live_bp.route("/results", methods=["POST"])
+@token_required
+def post_match_result():
+    """
+    Ingest a Live Match Result
+    
+    Applies a match score to team statistics, standings and ratings in one
+    transaction. Posting a new score for a match that already has one applies
+    the difference (score corrections). Unknown event_ids create the match.
+    ---
+    tags:
+      - Live
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - home_score
+            - away_score
+          properties:
+            event_id:
+              type: string
+              example: match_40
+            match_id:
+              type: integer
+            home_team:
+              type: string
+              example: Morocco
+            away_team:
+              type: string
+              example: Jordan
+            home_score:
+              type: integer
+              example: 2
+            away_score:
+              type: integer
+              example: 1
+            date:
+              type: string
+              example: 2025-12-18
+            stage:
+              type: string
+              example: Final
+    responses:
+      200:
+        description: Result applied
+        schema:
+          type: object
+          properties:
+            match_id:
+              type: integer
+            home_score:
+              type: integer
+            away_score:
+              type: integer
+            updated:
+              type: boolean
+      400:
+        description: Invalid payload
+      401:
+        description: Missing or invalid token
+    """
+    try:
+        result = ingest_match_result(request.get_json(silent=True) or {})
+    except IngestionError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
+
+
+@live_bp.route("/events", methods=["POST"])
+@token_required
+def post_match_event():
+    """
+    Ingest a Live Match Event
+    
+    Applies a goal or card as it happens. Goals update the score and every
+    aggregate derived from it, and credit the scorer and assister; cards are
+    credited to the player.
+    ---
+    tags:
+      - Live
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - type
+          properties:
+            event_id:
+              type: string
+              example: match_40
+            match_id:
+              type: integer
+            type:
+              type: string
+              enum: [goal, own_goal, penalty_goal, yellow_card, red_card, substitution, final_whistle]
+            team:
+              type: string
+              description: Team credited with the goal
+              example: Morocco
+            player_id:
+              type: integer
+            assist_player_id:
+              type: integer
+            minute:
+              type: integer
+              minimum: 0
+              example: 45
+            added_time:
+              type: integer
+              minimum: 0
+              example: 2
+    responses:
+      200:
+        description: Event applied
+      400:
+        description: Invalid payload
+      401:
+        description: Missing or invalid token
+    """
+    try:
+        result = ingest_match_event(request.get_json(silent=True) or {})
+    except IngestionError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
+
+
+@live_bp.route("/stream", methods=["GET"])
+def stream_live_updates():
+    """
+    Live Scores and Standings Stream (Server-Sent Events)
+    
+    Pushes compact diffs whenever the data changes, instead of re-polling
+    /api/matches/ and /api/leaderboards/standings:
+    - match: {event_id, home_team, away_team, home_score, away_score} for each changed score
+    - standings: {stage, rows} with only the rows whose position or points changed
+    - generation: {generation} after each batch of changes
+    - resync: the client missed messages and should refetch full state
+    
+    Event ids are data generations. Reconnecting clients send Last-Event-ID
+    to resume where they left off, on any server.
+    ---
+    tags:
+      - Live
+    produces:
+      - text/event-stream
+    responses:
+      200:
+        description: Event stream
+      307:
+        description: Streams are served by the dedicated stream server (LIVE_STREAM_URL)
+    """
+    if LIVE_STREAM_URL:
+        return redirect(f"{LIVE_STREAM_URL.rstrip('/')}{request.full_path.rstrip('?')}", code=307)
+
+    broadcaster.start(current_app._get_current_object())
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+
+    return Response(
+        broadcaster.subscribe(last_event_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        },
+    )
+
+
+@live_bp.route("/sync-status", methods=["GET"])
+@token_required
+def get_sync_status():
+    """
+    SportsDB Sync Status
+    
+    Circuit breaker metrics for the SportsDB client (state_code: 0 closed,
+    1 half-open, 2 open) as persisted by the last sync, and the last run of
+    each synced resource.
+    ---
+    tags:
+      - Live
+    responses:
+      200:
+        description: Breaker metrics and sync state
+      401:
+        description: Missing or invalid token
+    """
+    from models import SyncState
+    from services.sportsdb_service import BREAKER_RESOURCE, breaker_metrics
+
+    resources = [
+        {
+            'resource': state.resource,
+            'last_run_at': state.last_run_at.isoformat() if state.last_run_at else None,
+            'last_success_at': state.last_success_at.isoformat() if state.last_success_at else None,
+            'cursor': state.cursor,
+            'last_error': state.last_error,
+        }
+        for state in SyncState.query.order_by(SyncState.resource).all()
+        if state.resource != BREAKER_RESOURCE
+    ]
+    return jsonify({'breaker': breaker_metrics(), 'resources': resources})
@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify
-from services.db_data_service import get_all_matches
+from flask import Blueprint, jsonify, request
+from json_provider import LAYOUTS, apply_layout, cached_json, stream_json, wants_ndjson
+from services.db_data_service import get_all_matches, iter_matches
 
 matches_bp = Blueprint("matches", __name__, url_prefix="/api/matches")
 
@@ -14,9 +15,22 @@ def get_matches():
     - League context (average goals, BTTS %, clean sheet % from league.csv)
     
     All data is sourced from the relational database.
+    Send Accept: application/x-ndjson to stream one match per line,
+    or Accept: application/msgpack for MessagePack.
     ---
     tags:
       - Matches
+    produces:
+      - application/json
+      - application/x-ndjson
+      - application/msgpack
+    parameters:
+      - name: layout
+        in: query
+        type: string
+        enum: [rows, columns]
+        default: rows
+        description: "columns returns {count, columns: {field: [values]}} instead of one object per row"
     responses:
       200:
         description: List of all matches with context from CSV
@@ -49,7 +63,15 @@ def get_matches():
               league_btts_percentage:
                 type: number
                 example: 49
+      400:
+        description: Unknown layout
     """
-    # Load matches from database
-    matches = get_all_matches()
-    return jsonify(matches)
+    layout = request.args.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        return jsonify({"error": f"layout must be one of: {', '.join(LAYOUTS)}"}), 400
+    
+    if layout == 'rows' and wants_ndjson():
+        return stream_json(iter_matches(), ndjson=True)
+    
+    # Load matches from database, encoded once per data generation
+    return cached_json('matches', lambda layout: apply_layout(get_all_matches(), layout), layout)
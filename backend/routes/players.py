@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
-from services.db_data_service import get_all_players
+from json_provider import LAYOUTS, apply_layout, cached_json, stream_json, wants_ndjson
+from services.db_data_service import get_all_players, iter_players
+from services.percentile_service import get_player_percentiles
+from services.similarity_service import find_similar_players
 
 
 players_bp = Blueprint("players", __name__, url_prefix="/api/players")
@@ -19,9 +22,16 @@ def get_players():
     Query Parameters:
     - team: Filter by team/country name
     - position: Filter by position (Goalkeeper, Defender, Midfielder, Forward)
+    
+    Send Accept: application/x-ndjson to stream one player per line,
+    or Accept: application/msgpack for MessagePack.
     ---
     tags:
       - Players
+    produces:
+      - application/json
+      - application/x-ndjson
+      - application/msgpack
     parameters:
       - name: team
         in: query
@@ -35,6 +45,12 @@ def get_players():
         description: Filter by position category
         enum: [Goalkeeper, Defender, Midfielder, Forward]
         example: Forward
+      - name: layout
+        in: query
+        type: string
+        enum: [rows, columns]
+        default: rows
+        description: "columns returns {count, columns: {field: [values]}} instead of one object per row"
     responses:
       200:
         description: List of all players with position-aware stats from CSV
@@ -64,20 +80,188 @@ def get_players():
               assists_overall:
                 type: number
                 example: 18
+      400:
+        description: Unknown layout
     """
     team_filter = request.args.get('team', '').lower()
     position_filter = request.args.get('position', '').lower()
+    layout = request.args.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        return jsonify({"error": f"layout must be one of: {', '.join(LAYOUTS)}"}), 400
     
-    # Load all players from the database with position-aware stats
-    players = get_all_players()
+    # A column layout is a single document, never a line stream
+    ndjson = layout == 'rows' and wants_ndjson()
+    
+    # The unfiltered list is the hot path; it is encoded once per data generation
+    if not team_filter and not position_filter and not ndjson:
+        return cached_json('players', lambda layout: apply_layout(get_all_players(), layout), layout)
+    
+    # Stream players from the database with position-aware stats
+    players = iter_players()
     
     # Apply team filter if specified (filter by nationality, not club)
     if team_filter:
-        players = [p for p in players if (p.get('nationality') or '').lower() == team_filter]
+        players = (p for p in players if (p.get('nationality') or '').lower() == team_filter)
     
     # Apply position filter if specified
     if position_filter:
-        players = [p for p in players if (p.get('position') or '').lower() == position_filter]
+        players = (p for p in players if (p.get('position') or '').lower() == position_filter)
+    
+    if layout == 'columns':
+        return jsonify(apply_layout(list(players), layout))
+    return stream_json(players, ndjson=ndjson)
+
+
+
+@players_bp.route("/<int:player_id>/percentiles", methods=["GET"])
+def get_player_percentiles_route(player_id):
+    """
+    Get Player Percentile Profile
+    
+    Ranks a player's metrics against a population of players.
+    Percentiles are recomputed for the requested population instead of using
+    the vendor-provided *_percentile_overall columns.
     
-    return jsonify(players)
+    Query Parameters:
+    - population: position (player's own category), all, or a category name
+    - min_minutes: Only rank against players with at least this many minutes
+    - metrics: Comma-separated subset of metrics (defaults to the full profile)
+    ---
+    tags:
+      - Players
+    parameters:
+      - name: player_id
+        in: path
+        type: integer
+        required: true
+        example: 1
+      - name: population
+        in: query
+        type: string
+        default: position
+        enum: [position, all, Goalkeeper, Defender, Midfielder, Forward]
+      - name: min_minutes
+        in: query
+        type: integer
+        default: 0
+        example: 270
+      - name: metrics
+        in: query
+        type: string
+        description: Comma-separated metric names
+        example: goals_per_90,assists_per_90
+    responses:
+      200:
+        description: Percentile profile of the player
+        schema:
+          type: object
+          properties:
+            player_id:
+              type: integer
+            name:
+              type: string
+            position_category:
+              type: string
+              example: Defender
+            population:
+              type: object
+              properties:
+                position_category:
+                  type: string
+                min_minutes:
+                  type: integer
+                size:
+                  type: integer
+            percentiles:
+              type: object
+      400:
+        description: Unknown population or metric
+      404:
+        description: Player not found
+    """
+    population = request.args.get('population', 'position')
+    min_minutes = request.args.get('min_minutes', 0, type=int)
+    metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()]
+
+    try:
+        profile = get_player_percentiles(player_id, population, min_minutes, metrics or None)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if not profile:
+        return jsonify({"error": f"Player '{player_id}' not found"}), 404
+
+    return jsonify(profile)
+
+
+@players_bp.route("/<int:player_id>/similar", methods=["GET"])
+def get_similar_players(player_id):
+    """
+    Get Players Most Similar to a Player
+    
+    Finds the closest players within the same position category using a
+    z-scored feature matrix of per-90, rate and volume stats.
+    
+    Query Parameters:
+    - k: Number of similar players to return (max 50)
+    - metric: cosine (similarity, higher is closer) or euclidean (distance, lower is closer)
+    ---
+    tags:
+      - Players
+    parameters:
+      - name: player_id
+        in: path
+        type: integer
+        required: true
+        example: 1
+      - name: k
+        in: query
+        type: integer
+        default: 10
+      - name: metric
+        in: query
+        type: string
+        default: cosine
+        enum: [cosine, euclidean]
+    responses:
+      200:
+        description: Most similar players
+        schema:
+          type: object
+          properties:
+            player_id:
+              type: integer
+            name:
+              type: string
+            position_category:
+              type: string
+            metric:
+              type: string
+            similar:
+              type: array
+              items:
+                type: object
+                properties:
+                  player_id:
+                    type: integer
+                  name:
+                    type: string
+                  similarity:
+                    type: number
+      400:
+        description: Unknown metric
+      404:
+        description: Player not found
+    """
+    k = max(1, min(request.args.get('k', 10, type=int), 50))
+    metric = request.args.get('metric', 'cosine').lower()
+
+    try:
+        result = find_similar_players(player_id, k, metric)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if not result:
+        return jsonify({"error": f"Player '{player_id}' not found"}), 404
 
+    return jsonify(result)
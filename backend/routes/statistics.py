@@ -3,8 +3,15 @@ League and team statistics endpoints.
 All data is sourced exclusively from CSV files with no external API calls.
 """
 
-from flask import Blueprint, jsonify
-from services.db_data_service import get_league_stats, get_team_stats
+from flask import Blueprint, jsonify, request
+from json_provider import cached_json
+from services.db_data_service import (
+    get_league_stats, get_team_stats, get_team_analytics, find_team, get_head_to_head
+)
+from services.rating_service import get_current_ratings, get_rating_history
+from services.comparison_service import compare_pair, get_comparison_matrix_payload
+from services.goal_timing_service import get_goal_histogram, get_goal_halves, get_goal_histograms_by_team
+from services.simulation_service import get_simulation, MAX_SIMULATIONS
 
 
 statistics_bp = Blueprint("statistics", __name__, url_prefix="/api/statistics")
@@ -94,6 +101,52 @@ def get_league_summary():
     return jsonify(summary)
 
 
+@statistics_bp.route("/teams/analytics", methods=["GET"])
+def get_teams_analytics():
+    """
+    Get Computed Analytics for All Teams
+    
+    Returns the calculated profile of every team in one response:
+    - Record and win/draw/loss percentages
+    - Goal rates, clean sheet percentage and shot accuracy
+    - xG averages and xG difference
+    - Attack strength and defensive stability indexes
+    
+    Profiles are computed in a single batch pass and cached until the data changes.
+    ---
+    tags:
+      - Statistics
+    responses:
+      200:
+        description: Analytics profiles for every team
+        schema:
+          type: object
+          properties:
+            teams:
+              type: array
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                    example: Morocco
+                  attack_strength:
+                    type: object
+                    properties:
+                      score:
+                        type: number
+                        example: 35.0
+                      rating:
+                        type: string
+                        example: Average
+                  defensive_stability:
+                    type: object
+                  expected_goals:
+                    type: object
+    """
+    return cached_json('team_analytics', lambda: {"teams": get_team_analytics()})
+
+
 @statistics_bp.route("/teams/<team_name>", methods=["GET"])
 def get_team_statistics(team_name):
     """
@@ -212,45 +265,430 @@ def compare_teams(team1, team2):
       404:
         description: One or both teams not found
     """
-    stats1 = get_team_stats(team1)
-    stats2 = get_team_stats(team2)
+    comparison = compare_pair(team1, team2)
     
-    if not stats1 or not stats2:
+    if not comparison:
         return jsonify({"error": "One or both teams not found"}), 404
     
-    # Calculate comparative metrics (calculate points from wins/draws)
-    wins1 = stats1.get('wins', 0)
-    draws1 = stats1.get('draws', 0)
-    wins2 = stats2.get('wins', 0)
-    draws2 = stats2.get('draws', 0)
+    return jsonify(comparison)
+
+
+@statistics_bp.route("/comparison-matrix", methods=["GET"])
+def get_comparison_matrix():
+    """
+    Get All-Pairs Team Comparison Matrix
+    
+    Returns the comparison of every pair of teams in one payload. Matrix
+    cells are indexed [row][column] in the order of "teams":
+    - points_difference: row team points minus column team points
+    - leader, goal_difference_advantage, better_attack, better_defense:
+      1 when the row team has the edge, -1 when the column team does, 0 when equal
+    ---
+    tags:
+      - Statistics
+    responses:
+      200:
+        description: Pairwise comparison matrices
+        schema:
+          type: object
+          properties:
+            teams:
+              type: array
+              items:
+                type: string
+            points:
+              type: array
+              items:
+                type: integer
+            goal_spread:
+              type: array
+              items:
+                type: string
+            points_difference:
+              type: array
+              items:
+                type: array
+                items:
+                  type: integer
+            leader:
+              type: array
+              items:
+                type: array
+                items:
+                  type: integer
+    """
+    return cached_json('comparison_matrix', get_comparison_matrix_payload)
+
+
+@statistics_bp.route("/simulate", methods=["GET"])
+def simulate_tournament():
+    """
+    Simulate the Remaining Tournament (Monte Carlo)
+    
+    Samples Poisson scorelines from team xG averages for every fixture without
+    a result, applies the standings rules (points, goal difference, goals
+    scored, then lots) and returns the probability of each finishing position.
+    Completed matches are taken as played.
+    
+    Query Parameters:
+    - n: Number of simulations (max 1,000,000)
+    - seed: Seed for reproducible results (seeded runs are cached)
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: n
+        in: query
+        type: integer
+        default: 10000
+        example: 100000
+      - name: seed
+        in: query
+        type: integer
+        example: 42
+    responses:
+      200:
+        description: Finishing position probabilities per team
+        schema:
+          type: object
+          properties:
+            simulations:
+              type: integer
+            seed:
+              type: integer
+            remaining_fixtures:
+              type: integer
+            teams:
+              type: array
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                  current_points:
+                    type: integer
+                  expected_points:
+                    type: number
+                  expected_position:
+                    type: number
+                  most_likely_position:
+                    type: integer
+                  position_probabilities:
+                    type: array
+                    items:
+                      type: number
+      400:
+        description: Invalid number of simulations or negative seed
+    """
+    n = request.args.get('n', 10000, type=int)
+    seed = request.args.get('seed', type=int)
+
+    if n < 1 or n > MAX_SIMULATIONS:
+        return jsonify({"error": f"n must be between 1 and {MAX_SIMULATIONS}"}), 400
+    if seed is not None and seed < 0:
+        return jsonify({"error": "seed must be a non-negative integer"}), 400
+
+    return jsonify(get_simulation(n, seed))
+
+
+@statistics_bp.route("/ratings", methods=["GET"])
+def get_team_ratings():
+    """
+    Get Current Elo Ratings
+    
+    Returns every team's current Elo rating, read from the latest rating
+    checkpoint per team. Ratings start at 1500 and are updated after each
+    completed match, weighted by goal difference.
+    ---
+    tags:
+      - Statistics
+    responses:
+      200:
+        description: Teams ranked by current rating
+        schema:
+          type: object
+          properties:
+            ratings:
+              type: array
+              items:
+                type: object
+                properties:
+                  rank:
+                    type: integer
+                  name:
+                    type: string
+                    example: Morocco
+                  rating:
+                    type: number
+                    example: 1587.3
+                  matches_rated:
+                    type: integer
+    """
+    return cached_json('ratings', lambda: {"ratings": get_current_ratings()})
+
+
+@statistics_bp.route("/ratings/<team_name>", methods=["GET"])
+def get_team_rating_history(team_name):
+    """
+    Get Elo Rating History for a Team
     
-    pts1 = wins1 * 3 + draws1
-    pts2 = wins2 * 3 + draws2
-    gf1 = stats1.get('goals_scored', 0)
-    gf2 = stats2.get('goals_scored', 0)
-    ga1 = stats1.get('goals_conceded', 0)
-    ga2 = stats2.get('goals_conceded', 0)
+    Returns the team's rating checkpoint after every rated match, in match order.
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: team_name
+        in: path
+        type: string
+        required: true
+        example: Morocco
+    responses:
+      200:
+        description: Rating history of the team
+        schema:
+          type: object
+          properties:
+            name:
+              type: string
+            initial_rating:
+              type: number
+            history:
+              type: array
+              items:
+                type: object
+                properties:
+                  date:
+                    type: string
+                  opponent:
+                    type: string
+                  rating_before:
+                    type: number
+                  rating_after:
+                    type: number
+                  change:
+                    type: number
+      404:
+        description: Team not found
+    """
+    team = find_team(team_name)
+    if not team:
+        return jsonify({"error": f"Team '{team_name}' not found"}), 404
+
+    return jsonify(get_rating_history(team))
+
+
+def _goal_timing_params():
+    """Resolve the shared bucket/team query parameters; returns (bucket, team, error response)"""
+    bucket = request.args.get('bucket', 15, type=int)
+    if bucket < 1 or bucket > 90:
+        return None, None, (jsonify({"error": "bucket must be between 1 and 90 minutes"}), 400)
+
+    team = None
+    team_name = request.args.get('team')
+    if team_name:
+        team = find_team(team_name)
+        if not team:
+            return None, None, (jsonify({"error": f"Team '{team_name}' not found"}), 404)
+
+    return bucket, team, None
+
+
+@statistics_bp.route("/goal-timings", methods=["GET"])
+def get_goal_timings():
+    """
+    Get Goal Timing Histogram
     
-    return jsonify({
-        "team1": {
-            "name": team1,
-            "stats": stats1
-        },
-        "team2": {
-            "name": team2,
-            "stats": stats2
-        },
-        "comparison": {
-            "points_difference": abs(pts1 - pts2),
-            "leader": team1 if pts1 > pts2 else (team2 if pts2 > pts1 else "Equal"),
-            "goal_difference_advantage": team1 if (gf1 - ga1) > (gf2 - ga2) else (team2 if (gf2 - ga2) > (gf1 - ga1) else "Equal"),
-            "better_attack": team1 if gf1 > gf2 else (team2 if gf2 > gf1 else "Equal"),
-            "better_defense": team1 if ga1 < ga2 else (team2 if ga2 < ga1 else "Equal"),
-            "goal_spread": {
-                "team1_for_against": f"{int(gf1)}:{int(ga1)}",
-                "team2_for_against": f"{int(gf2)}:{int(ga2)}"
-            },
-            "team1_points": pts1,
-            "team2_points": pts2
-        }
-    })
+    Counts goals per minute bucket, league-wide or for one team, from the
+    goal minutes recorded for each match. Added time counts toward the minute
+    it extends (45'2 falls in the bucket containing minute 45).
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: bucket
+        in: query
+        type: integer
+        default: 15
+        description: Bucket width in minutes (1-90)
+      - name: team
+        in: query
+        type: string
+        example: Morocco
+    responses:
+      200:
+        description: Goal counts per minute bucket
+        schema:
+          type: object
+          properties:
+            bucket_minutes:
+              type: integer
+            total_goals:
+              type: integer
+            buckets:
+              type: array
+              items:
+                type: object
+                properties:
+                  from:
+                    type: integer
+                  to:
+                    type: integer
+                  goals:
+                    type: integer
+      400:
+        description: Invalid bucket width
+      404:
+        description: Team not found
+    """
+    bucket, team, error = _goal_timing_params()
+    if error:
+        return error
+
+    return cached_json('goal_timings', get_goal_histogram, bucket, team.id if team else None)
+
+
+@statistics_bp.route("/goal-timings/halves", methods=["GET"])
+def get_goal_timings_by_half():
+    """
+    Get Goals by Half
+    
+    Splits goals into first half (incl. first-half added time), second half
+    and extra time, league-wide or for one team.
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: team
+        in: query
+        type: string
+        example: Morocco
+    responses:
+      200:
+        description: Goal counts per period
+        schema:
+          type: object
+          properties:
+            total_goals:
+              type: integer
+            first_half:
+              type: integer
+            second_half:
+              type: integer
+            extra_time:
+              type: integer
+      404:
+        description: Team not found
+    """
+    _, team, error = _goal_timing_params()
+    if error:
+        return error
+
+    return cached_json('goal_timings_halves', get_goal_halves, team.id if team else None)
+
+
+@statistics_bp.route("/goal-timings/teams", methods=["GET"])
+def get_goal_timings_by_team():
+    """
+    Get Goal Timing Histograms for All Teams
+    
+    Returns every team's goal histogram at the requested bucket width in one response.
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: bucket
+        in: query
+        type: integer
+        default: 15
+        description: Bucket width in minutes (1-90)
+    responses:
+      200:
+        description: Goal histograms per team
+        schema:
+          type: object
+          properties:
+            bucket_minutes:
+              type: integer
+            teams:
+              type: array
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                  total_goals:
+                    type: integer
+                  buckets:
+                    type: array
+                    items:
+                      type: object
+      400:
+        description: Invalid bucket width
+    """
+    bucket, _, error = _goal_timing_params()
+    if error:
+        return error
+
+    return cached_json('goal_timings_teams', get_goal_histograms_by_team, bucket)
+
+
+@statistics_bp.route("/head-to-head/<team1>/<team2>", methods=["GET"])
+def get_head_to_head_record(team1, team2):
+    """
+    Get Head-to-Head Record Between Two Teams
+    
+    Returns every direct meeting between the two teams and the aggregated
+    record (wins, draws, goals) from team1's perspective.
+    ---
+    tags:
+      - Statistics
+    parameters:
+      - name: team1
+        in: path
+        type: string
+        required: true
+        example: Morocco
+      - name: team2
+        in: path
+        type: string
+        required: true
+        example: Jordan
+    responses:
+      200:
+        description: Head-to-head record and meetings
+        schema:
+          type: object
+          properties:
+            team1:
+              type: string
+            team2:
+              type: string
+            record:
+              type: object
+              properties:
+                matches_played:
+                  type: integer
+                team1_wins:
+                  type: integer
+                team2_wins:
+                  type: integer
+                draws:
+                  type: integer
+                team1_goals:
+                  type: integer
+                team2_goals:
+                  type: integer
+            matches:
+              type: array
+              items:
+                type: object
+      404:
+        description: One or both teams not found
+    """
+    first = find_team(team1)
+    second = find_team(team2)
+
+    if not first or not second:
+        return jsonify({"error": "One or both teams not found"}), 404
+
+    return jsonify(get_head_to_head(first, second))
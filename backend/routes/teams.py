@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint
+from json_provider import cached_json
 from services.db_data_service import get_all_teams, get_team_stats
 
 teams_bp = Blueprint("teams", __name__, url_prefix="/api/teams")
@@ -50,10 +51,8 @@ def get_teams():
               total_assists:
                 type: integer
     """
-    # Load teams from database with aggregated stats
-    teams = get_all_teams()
-    
-    return jsonify(teams)
+    # Load teams from database with aggregated stats, encoded once per data generation
+    return cached_json('teams', get_all_teams)
 
 
 
@@ -0,0 +1,101 @@
+"""
+In-place schema upgrades for existing databases.
+db.create_all() creates missing tables but never alters existing ones, so a
+database created before a column or index was added to a model is brought up
+to date here: missing nullable columns are added with ALTER TABLE, missing
+indexes are created, and each newly added column can be backfilled from data
+already in the table. Runs at startup after create_all, and as
+`flask upgrade-db`. Every step is idempotent.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from extensions import db
+
+
+def _backfill_pair_key(conn):
+    conn.execute(text(
+        "UPDATE matches SET "
+        "pair_low_team_id = CASE WHEN home_team_id < away_team_id THEN home_team_id ELSE away_team_id END, "
+        "pair_high_team_id = CASE WHEN home_team_id < away_team_id THEN away_team_id ELSE home_team_id END "
+        "WHERE home_team_id IS NOT NULL AND away_team_id IS NOT NULL"
+    ))
+
+
+def _backfill_stage(conn):
+    import pandas as pd
+    from services.clean_csv_import import CleanCSVImport, derive_stages
+
+    try:
+        df = pd.read_csv(CleanCSVImport().matches_csv)
+    except FileNotFoundError:
+        return
+    statement = text(
+        "UPDATE matches SET stage = :stage "
+        "WHERE home_team = :home AND away_team = :away AND date = :date AND stage IS NULL"
+    )
+    params = [
+        {'stage': stage, 'home': home, 'away': away, 'date': date}
+        for stage, home, away, date in zip(derive_stages(df), df['home_team_name'], df['away_team_name'], df['date_GMT'])
+        if stage
+    ]
+    if params:
+        conn.execute(statement, params)
+
+
+# (table, column) -> backfill run once, right after the column is added
+BACKFILLS = {
+    ('matches', 'stage'): _backfill_stage,
+    ('matches', 'pair_low_team_id'): _backfill_pair_key,
+}
+
+
+def _add_column(conn, table, column):
+    if not column.nullable and column.server_default is None:
+        raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a server default")
+    preparer = conn.dialect.identifier_preparer
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(
+        f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+    ))
+
+
+def upgrade_schema(engine=None):
+    """Add missing columns and indexes to existing tables; returns a list of the changes made"""
+    engine = engine or db.engine
+    changes = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                # Created by db.create_all(), complete with its indexes
+                continue
+
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            added = []
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                try:
+                    _add_column(conn, table, column)
+                except (OperationalError, ProgrammingError):
+                    # Another process added it between the inspection and the ALTER
+                    continue
+                added.append(column.name)
+                changes.append(f"added column {table.name}.{column.name}")
+
+            for name in added:
+                backfill = BACKFILLS.get((table.name, name))
+                if backfill:
+                    backfill(conn)
+                    changes.append(f"backfilled {table.name}.{name}")
+
+            indexed = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexed:
+                    index.create(conn, checkfirst=True)
+                    changes.append(f"created index {index.name}")
+    return changes
@@ -0,0 +1,135 @@
+"""
+Generation-keyed cache for computed payloads.
+Every write that changes tournament data bumps the data generation, and any
+value computed under an older generation is recomputed on next access.
+
+The generation is stored in the database (data_generation), so bumps made by
+another process, such as a `flask clean-import` or `flask sync-sportsdb` run,
+or another host, reach the server within GENERATION_TTL seconds. Within one
+host the last known value also lives in shared memory, so when the app is
+preloaded and forked (gunicorn preload_app) a bump in one worker invalidates
+every worker's cache immediately.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import has_app_context
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from extensions import db
+from models import DataGeneration
+
+
+# Seconds a process trusts its generation before re-reading the stored counter
+GENERATION_TTL = float(os.getenv("CACHE_GENERATION_TTL", "1.0"))
+
+_lock = threading.Lock()
+_shared_generation = multiprocessing.RawValue('q', 0)
+_shared_lock = multiprocessing.Lock()
+_checked_at = 0.0
+_entries = {}
+_listeners = []
+
+
+def _read_stored():
+    """The stored generation, or None without an app context or before the table exists"""
+    if not has_app_context():
+        return None
+    try:
+        # A separate connection keeps the read out of the caller's transaction
+        with db.engine.connect() as conn:
+            return conn.execute(select(DataGeneration.value).where(DataGeneration.id == 1)).scalar() or 0
+    except SQLAlchemyError:
+        return None
+
+
+def _increment_stored():
+    """Atomically advance the stored generation; returns the new value, or None if unavailable"""
+    if not has_app_context():
+        return None
+    statement = update(DataGeneration).where(DataGeneration.id == 1).values(value=DataGeneration.value + 1)
+    try:
+        for _ in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    if not conn.execute(statement).rowcount:
+                        conn.execute(insert(DataGeneration).values(id=1, value=1))
+                    return conn.execute(select(DataGeneration.value).where(DataGeneration.id == 1)).scalar()
+            except IntegrityError:
+                # Another process created the row first; increment it instead
+                continue
+    except SQLAlchemyError:
+        return None
+    return None
+
+
+def _notify(generation):
+    with _lock:
+        _entries.clear()
+    for listener in list(_listeners):
+        listener(generation)
+
+
+def get_generation():
+    """Return the current data generation, re-reading the stored one at most every GENERATION_TTL"""
+    global _checked_at
+    now = time.monotonic()
+    if now - _checked_at >= GENERATION_TTL:
+        stored = _read_stored()
+        if stored is not None:
+            _checked_at = now
+            with _shared_lock:
+                advanced = stored > _shared_generation.value
+                if advanced:
+                    _shared_generation.value = stored
+            if advanced:
+                _notify(stored)
+    return _shared_generation.value
+
+
+def bump_generation():
+    """Advance the data generation, invalidating every cached value in every process"""
+    stored = _increment_stored()
+    with _shared_lock:
+        if stored is None:
+            _shared_generation.value += 1
+        else:
+            _shared_generation.value = max(_shared_generation.value + 1, stored)
+        generation = _shared_generation.value
+    _notify(generation)
+    return generation
+
+
+def add_generation_listener(callback):
+    """Call callback(generation) after every bump; callbacks must not block"""
+    _listeners.append(callback)
+
+
+def get_cached(key, compute):
+    """Return the value cached under key for this generation, computing it if missing"""
+    generation = get_generation()
+    entry = _entries.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    value = compute()
+    with _lock:
+        if generation == _shared_generation.value:
+            _entries[key] = (generation, value)
+    return value
+
+
+def cached(name):
+    """Decorator caching a function's result per data generation and arguments"""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return get_cached(key, lambda: f(*args, **kwargs))
+        return wrapper
+    return decorator
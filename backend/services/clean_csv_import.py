@@ -6,11 +6,59 @@ Ensures each team has exactly 23 players.
 
 import pandas as pd
 from extensions import db
-from models import Team, Player, Match, PlayerStatistics, TeamStatistics
+from models import Team, Player, Match, MatchGoal, PlayerStatistics, TeamStatistics, TeamRating, Standing, SyncState
+from services.cache_service import bump_generation
+from services.rating_service import rebuild_ratings
+from services.standings_service import rebuild_standings
+from services.goal_timing_service import parse_goal_timings
 import os
 from datetime import datetime
 
 
+def derive_stages(df):
+    """
+    Group label for each matches.csv row, derived from the 'Game Week' column.
+    Every group plays a round robin, so the groups are the sets of teams
+    connected by fixtures from game week 2 on, named Group A, B, ... in kickoff
+    order. Numbered fixtures between teams of different groups (qualifiers) and
+    knockout fixtures (no game week) get no stage. An explicit 'stage' column
+    takes precedence.
+    """
+    if 'stage' in df.columns:
+        return [None if pd.isna(stage) or stage == '' else stage for stage in df['stage']]
+    if 'Game Week' not in df.columns:
+        return [None] * len(df)
+
+    weeks = pd.to_numeric(df['Game Week'], errors='coerce')
+    parent = {}
+
+    def find(team):
+        parent.setdefault(team, team)
+        while parent[team] != team:
+            parent[team] = parent[parent[team]]
+            team = parent[team]
+        return team
+
+    for week, home, away in zip(weeks, df['home_team_name'], df['away_team_name']):
+        if week >= 2:
+            parent[find(home)] = find(away)
+
+    order = df['timestamp'].argsort(kind='stable') if 'timestamp' in df.columns else range(len(df))
+    labels = {}
+    stages = [None] * len(df)
+    for position in order:
+        home, away = df['home_team_name'].iat[position], df['away_team_name'].iat[position]
+        if pd.isna(weeks.iat[position]) or home not in parent or away not in parent:
+            continue
+        group = find(home)
+        if group != find(away):
+            continue
+        if group not in labels:
+            labels[group] = f"Group {chr(ord('A') + len(labels))}"
+        stages[position] = labels[group]
+    return stages
+
+
 class CleanCSVImport:
     """Clean import from CSV files - replaces all existing data"""
     
@@ -29,6 +77,7 @@ class CleanCSVImport:
             'teams_imported': 0,
             'players_imported': 0,
             'matches_imported': 0,
+            'goals_imported': 0,
             'team_stats_created': 0,
             'player_stats_created': 0
         }
@@ -56,11 +105,17 @@ class CleanCSVImport:
         print("🗑️  Clearing old data...")
         
         # Clear in order to respect foreign keys
+        TeamRating.query.delete()
+        Standing.query.delete()
+        MatchGoal.query.delete()
         PlayerStatistics.query.delete()
         TeamStatistics.query.delete()
         Player.query.delete()
         Match.query.delete()
         Team.query.delete()
+
+        # The SportsDB sync must re-apply everything on top of the fresh import
+        SyncState.query.update({'last_payload_hash': None, 'cursor': None})
         
         db.session.commit()
         print("  ✅ All old data cleared")
@@ -215,7 +270,8 @@ class CleanCSVImport:
             print("  ⚠️  matches.csv not found, skipping")
             return
         
-        for _, row in df.iterrows():
+        stages = derive_stages(df)
+        for (_, row), stage in zip(df.iterrows(), stages):
             home_team_name = row.get('home_team_name', '')
             away_team_name = row.get('away_team_name', '')
             
@@ -248,13 +304,53 @@ class CleanCSVImport:
                 home_score=self.safe_int(row.get('home_team_goal_count', 0)),
                 away_score=self.safe_int(row.get('away_team_goal_count', 0)),
                 date=date_str,
-                venue=venue
+                venue=venue,
+                stage=stage
             )
+            match.update_pair_key()
             db.session.add(match)
+            db.session.flush()
+            
+            self.add_goal_timings(match, row)
             self.stats['matches_imported'] += 1
         
         db.session.commit()
-        print(f"  ✅ {self.stats['matches_imported']} matches imported")
+        print(f"  ✅ {self.stats['matches_imported']} matches imported ({self.stats['goals_imported']} goal timings)")
+    
+    def add_goal_timings(self, match, row):
+        """Normalize a row's goal minutes ("14,40,45'2") into match_goals rows"""
+        for team_id, column in ((match.home_team_id, 'home_team_goal_timings'), (match.away_team_id, 'away_team_goal_timings')):
+            for minute, added_time in parse_goal_timings(row.get(column)):
+                db.session.add(MatchGoal(
+                    match_id=match.id,
+                    team_id=team_id,
+                    minute=minute,
+                    added_time=added_time
+                ))
+                self.stats['goals_imported'] += 1
+    
+    def backfill_goal_timings(self):
+        """
+        Fill an empty match_goals table from matches.csv, for a database whose
+        matches were imported before goal timings were recorded. Rows are
+        matched to stored matches by teams and kickoff date.
+        """
+        try:
+            df = pd.read_csv(self.matches_csv)
+        except FileNotFoundError:
+            return 0
+        
+        matches = {
+            (match.home_team, match.away_team, match.date): match
+            for match in Match.query.filter(Match.home_team_id.isnot(None), Match.away_team_id.isnot(None))
+        }
+        for _, row in df.iterrows():
+            match = matches.get((row.get('home_team_name'), row.get('away_team_name'), row.get('date_GMT')))
+            if match:
+                self.add_goal_timings(match, row)
+        
+        db.session.commit()
+        return self.stats['goals_imported']
     
     def execute(self):
         """Execute full clean import"""
@@ -275,6 +371,15 @@ class CleanCSVImport:
             # Step 4: Import matches
             self.import_matches()
             
+            # Step 5: Rebuild Elo rating checkpoints from the match history
+            rebuild_ratings()
+            
+            # Step 6: Rebuild standings tables from the match results
+            rebuild_standings()
+            
+            # Step 7: Invalidate cached payloads computed from the old data
+            bump_generation()
+            
             # Summary
             print("\n" + "=" * 60)
             print("✅ Clean Import Complete")
@@ -0,0 +1,107 @@
+"""
+All-pairs team comparison matrix.
+Built once per data generation with NumPy broadcasting over the team stat
+vectors; the pairwise comparison endpoint slices its answer from it.
+"""
+
+import numpy as np
+
+from services.cache_service import cached
+from services.db_data_service import get_all_teams, get_league_stats, normalize_team_name
+
+
+TEAM_STAT_KEYS = [
+    'country', 'name', 'team_name', 'matches_played', 'wins', 'draws', 'losses',
+    'goals_scored', 'goals_conceded', 'clean_sheets', 'shots', 'shots_on_target',
+    'average_possession', 'points', 'goal_difference', 'total_players',
+    'total_goals', 'total_assists', 'avg_player_rating',
+]
+
+
+class ComparisonMatrix:
+    """Signed row-minus-column differences for every pair of teams"""
+
+    def __init__(self, teams, league_stats):
+        self.names = [team['name'] for team in teams]
+        self.stats = []
+        self.index_of = {}
+        for idx, team in enumerate(teams):
+            stats = {key: team.get(key) for key in TEAM_STAT_KEYS}
+            if league_stats:
+                stats['league_avg_goals'] = league_stats.get('average_goals_per_match', 0)
+                stats['league_clean_sheets_percentage'] = league_stats.get('clean_sheets_percentage', 0)
+                stats['league_avg_corners'] = league_stats.get('average_corners_per_match', 0)
+            self.stats.append(stats)
+            for key in (team.get('country'), team.get('name')):
+                self.index_of.setdefault(normalize_team_name(key), idx)
+
+        wins = np.array([team['wins'] for team in teams], dtype=np.int64)
+        draws = np.array([team['draws'] for team in teams], dtype=np.int64)
+        self.goals_for = np.array([team['goals_scored'] for team in teams], dtype=np.int64)
+        self.goals_against = np.array([team['goals_conceded'] for team in teams], dtype=np.int64)
+        self.points = wins * 3 + draws
+        goal_difference = self.goals_for - self.goals_against
+
+        self.points_difference = self.points[:, None] - self.points[None, :]
+        self.goal_difference_difference = goal_difference[:, None] - goal_difference[None, :]
+        self.attack_difference = self.goals_for[:, None] - self.goals_for[None, :]
+        # Fewer goals conceded is the better defense, so the sign is flipped
+        self.defense_difference = self.goals_against[None, :] - self.goals_against[:, None]
+
+    def find(self, team_name):
+        return self.index_of.get(normalize_team_name(team_name))
+
+    def compare(self, i, j, label1, label2):
+        """Pairwise comparison in the /comparison/<team1>/<team2> response format"""
+        def edge(sign):
+            return label1 if sign > 0 else (label2 if sign < 0 else "Equal")
+
+        return {
+            "team1": {"name": label1, "stats": self.stats[i]},
+            "team2": {"name": label2, "stats": self.stats[j]},
+            "comparison": {
+                "points_difference": abs(int(self.points_difference[i, j])),
+                "leader": edge(self.points_difference[i, j]),
+                "goal_difference_advantage": edge(self.goal_difference_difference[i, j]),
+                "better_attack": edge(self.attack_difference[i, j]),
+                "better_defense": edge(self.defense_difference[i, j]),
+                "goal_spread": {
+                    "team1_for_against": f"{int(self.goals_for[i])}:{int(self.goals_against[i])}",
+                    "team2_for_against": f"{int(self.goals_for[j])}:{int(self.goals_against[j])}",
+                },
+                "team1_points": int(self.points[i]),
+                "team2_points": int(self.points[j]),
+            },
+        }
+
+    def to_payload(self):
+        return {
+            "teams": self.names,
+            "points": self.points.tolist(),
+            "goal_spread": [f"{int(gf)}:{int(ga)}" for gf, ga in zip(self.goals_for, self.goals_against)],
+            "points_difference": self.points_difference.tolist(),
+            "leader": np.sign(self.points_difference).tolist(),
+            "goal_difference_advantage": np.sign(self.goal_difference_difference).tolist(),
+            "better_attack": np.sign(self.attack_difference).tolist(),
+            "better_defense": np.sign(self.defense_difference).tolist(),
+        }
+
+
+@cached("comparison_matrix")
+def get_comparison_matrix():
+    return ComparisonMatrix(get_all_teams(), get_league_stats())
+
+
+@cached("comparison_matrix_payload")
+def get_comparison_matrix_payload():
+    return get_comparison_matrix().to_payload()
+
+
+def compare_pair(team1, team2):
+    """Compare two teams by slicing the cached matrix; None when either team is unknown"""
+    matrix = get_comparison_matrix()
+    i = matrix.find(team1)
+    j = matrix.find(team2)
+    if i is None or j is None:
+        return None
+    return matrix.compare(i, j, team1, team2)
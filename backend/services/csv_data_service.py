@@ -7,7 +7,6 @@ No external API calls. All data comes from:
 - league.csv
 """
 
-import pandas as pd
 import os
 import math
 from pathlib import Path
@@ -20,6 +19,20 @@ MATCHES_CSV = DATA_DIR / "matches.csv"
 LEAGUE_CSV = DATA_DIR / "league.csv"
 
 
+def get_position_category(position):
+    """Categorize a free-text position (CSV or SportsDB) as Goalkeeper/Defender/Midfielder/Forward/Unknown"""
+    pos = position.lower() if isinstance(position, str) else ''
+    if 'goalkeeper' in pos or 'gk' in pos:
+        return 'Goalkeeper'
+    if 'defender' in pos or 'back' in pos or 'cb' in pos or 'lb' in pos or 'rb' in pos:
+        return 'Defender'
+    if 'midfielder' in pos or 'mid' in pos or 'cm' in pos:
+        return 'Midfielder'
+    if 'forward' in pos or 'striker' in pos or 'st' in pos or 'winger' in pos or 'wing' in pos:
+        return 'Forward'
+    return 'Unknown'
+
+
 class CSVDataService:
     """Service to load and process data exclusively from CSV files"""
     
@@ -59,6 +72,7 @@ class CSVDataService:
     def load_teams(cls):
         """Load teams CSV"""
         if cls._teams_df is None:
+            import pandas as pd
             cls._teams_df = pd.read_csv(TEAMS_CSV)
             # Replace NaN with None for JSON serialization
             cls._teams_df = cls._teams_df.where(pd.notnull(cls._teams_df), None)
@@ -68,6 +82,7 @@ class CSVDataService:
     def load_players(cls):
         """Load players CSV"""
         if cls._players_df is None:
+            import pandas as pd
             cls._players_df = pd.read_csv(PLAYERS_CSV)
             # Replace NaN with None for JSON serialization
             cls._players_df = cls._players_df.where(pd.notnull(cls._players_df), None)
@@ -77,6 +92,7 @@ class CSVDataService:
     def load_matches(cls):
         """Load matches CSV"""
         if cls._matches_df is None:
+            import pandas as pd
             cls._matches_df = pd.read_csv(MATCHES_CSV)
             # Replace NaN with None for JSON serialization
             cls._matches_df = cls._matches_df.where(pd.notnull(cls._matches_df), None)
@@ -86,6 +102,7 @@ class CSVDataService:
     def load_league(cls):
         """Load league CSV"""
         if cls._league_df is None:
+            import pandas as pd
             cls._league_df = pd.read_csv(LEAGUE_CSV)
             # Replace NaN with None for JSON serialization
             cls._league_df = cls._league_df.where(pd.notnull(cls._league_df), None)
@@ -239,18 +256,7 @@ class CSVDataService:
     @classmethod
     def _get_player_type(cls, position_str):
         """Categorize player type from position string"""
-        pos = position_str.lower() if position_str else ''
-        
-        if 'goalkeeper' in pos or 'gk' in pos:
-            return 'Goalkeeper'
-        elif 'defender' in pos or 'back' in pos or 'cb' in pos or 'lb' in pos or 'rb' in pos:
-            return 'Defender'
-        elif 'midfielder' in pos or 'mid' in pos or 'cm' in pos:
-            return 'Midfielder'
-        elif 'forward' in pos or 'striker' in pos or 'st' in pos or 'winger' in pos or 'wing' in pos:
-            return 'Forward'
-        else:
-            return 'Unknown'
+        return get_position_category(position_str)
     
     @classmethod
     def get_leaderboard_data(cls, stat_name, limit=10, player_type=None):
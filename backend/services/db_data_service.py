@@ -3,11 +3,18 @@ Database-backed Data Service.
 Provides data from PostgreSQL via SQLAlchemy models.
 """
 
+from datetime import datetime
+
 from sqlalchemy import func
 from extensions import db
 from models import Team, TeamStatistics, Player, PlayerStatistics, Match
 from services.csv_data_service import CSVDataService
+from services.cache_service import cached
+from services.statistics_calculator import TeamStatsCalculator
+
 
+# Rows fetched per round trip when streaming collections
+STREAM_BATCH_SIZE = 500
 
 TEAM_NAME_MAP = {
     'uae': 'united arab emirates',
@@ -24,6 +31,21 @@ def normalize_team_name(name):
     return (mapped or lowered).strip()
 
 
+MATCH_DATE_FORMATS = ('%b %d %Y - %I:%M%p', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+def parse_match_date(value):
+    """Parse the CSV ("Nov 25 2025 - 1:00pm") and SportsDB ("2025-11-25") date formats"""
+    if isinstance(value, datetime):
+        return value
+    for fmt in MATCH_DATE_FORMATS:
+        try:
+            return datetime.strptime((value or '').strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
 def _player_aggregates_subquery():
     return db.session.query(
         Player.team_id.label('team_id'),
@@ -81,15 +103,16 @@ def get_all_teams():
     return teams
 
 
-def get_team_stats(team_name):
+def find_team(team_name):
     target = normalize_team_name(team_name)
-    teams = Team.query.all()
-    match = None
-    for team in teams:
+    for team in Team.query.all():
         if normalize_team_name(team.country) == target or normalize_team_name(team.name) == target:
-            match = team
-            break
+            return team
+    return None
+
 
+def get_team_stats(team_name):
+    match = find_team(team_name)
     if not match:
         return None
 
@@ -136,16 +159,32 @@ def get_team_stats(team_name):
     return team_stats
 
 
-def get_all_players():
-    rows = db.session.query(Player, PlayerStatistics).outerjoin(
+@cached("team_analytics")
+def get_team_analytics():
+    rows = db.session.query(Team, TeamStatistics).join(
+        TeamStatistics, TeamStatistics.team_id == Team.id
+    ).order_by(Team.id).all()
+    return TeamStatsCalculator.calculate_batch_metrics(rows)
+
+
+def iter_players(batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield player dicts with position-aware stats, reading rows in batches
+    through a server-side cursor. Rows are detached from the session once
+    converted, so memory stays flat however many players are streamed.
+    """
+    query = db.session.query(Player, PlayerStatistics).outerjoin(
         PlayerStatistics, PlayerStatistics.player_id == Player.id
-    ).all()
+    ).order_by(Player.id).yield_per(batch_size)
 
-    players = []
-    for player, stats in rows:
+    for player, stats in query:
+        if stats is not None:
+            # calculate_metrics() below dirties stats; dirty objects are pinned by the session
+            db.session.expunge(stats)
+        db.session.expunge(player)
         stats = stats or PlayerStatistics(player_id=player.id)
         stats.calculate_metrics()
-        players.append({
+        yield {
             'full_name': player.name,
             'name': player.name,
             'position': stats.position or player.position or 'Unknown',
@@ -180,9 +219,11 @@ def get_all_players():
             'passes_per_90_overall': 0,
             'blocks_per_game_overall': 0,
             'clearances_per_game_overall': 0,
-        })
+        }
+
 
-    return players
+def get_all_players():
+    return list(iter_players())
 
 
 def get_players_by_team(team_country):
@@ -252,10 +293,10 @@ def get_leaderboard(stat_name, limit=10, player_type=None):
     return leaderboard
 
 
-def get_all_matches():
-    matches = Match.query.all()
-    return [
-        {
+def iter_matches(batch_size=STREAM_BATCH_SIZE):
+    """Yield match dicts, reading rows in batches through a server-side cursor"""
+    for m in Match.query.order_by(Match.id).yield_per(batch_size):
+        yield {
             'event_id': m.event_id,
             'date': m.date,
             'home_team': m.home_team,
@@ -264,8 +305,59 @@ def get_all_matches():
             'away_score': m.away_score,
             'venue': m.venue,
         }
-        for m in matches
-    ]
+
+
+def get_all_matches():
+    return list(iter_matches())
+
+
+def get_head_to_head(team1, team2):
+    low, high = sorted((team1.id, team2.id))
+    matches = Match.query.filter_by(
+        pair_low_team_id=low, pair_high_team_id=high
+    ).order_by(Match.id).all()
+
+    record = {
+        'matches_played': 0,
+        'team1_wins': 0,
+        'team2_wins': 0,
+        'draws': 0,
+        'team1_goals': 0,
+        'team2_goals': 0,
+    }
+    for m in matches:
+        if m.home_score is None or m.away_score is None:
+            continue
+        team1_goals, team2_goals = (
+            (m.home_score, m.away_score) if m.home_team_id == team1.id else (m.away_score, m.home_score)
+        )
+        record['matches_played'] += 1
+        record['team1_goals'] += team1_goals
+        record['team2_goals'] += team2_goals
+        if team1_goals > team2_goals:
+            record['team1_wins'] += 1
+        elif team2_goals > team1_goals:
+            record['team2_wins'] += 1
+        else:
+            record['draws'] += 1
+
+    return {
+        'team1': team1.name,
+        'team2': team2.name,
+        'record': record,
+        'matches': [
+            {
+                'event_id': m.event_id,
+                'date': m.date,
+                'home_team': m.home_team,
+                'away_team': m.away_team,
+                'home_score': m.home_score,
+                'away_score': m.away_score,
+                'venue': m.venue,
+            }
+            for m in matches
+        ],
+    }
 
 
 def get_league_stats():
@@ -0,0 +1,323 @@
+"""
+Append-only match event log with periodic snapshots.
+Every live result/event is appended to line-delimited segment files before
+its transaction commits, with the log locked until the commit is done, so
+the log order is the commit order; every SNAPSHOT_INTERVAL events the
+aggregate state is snapshotted. Recovery restores the latest snapshot and
+replays only the events after it.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows dev setups: in-process locking only
+    fcntl = None
+
+from extensions import db
+from models import Match, MatchGoal, Player, PlayerStatistics, Standing, Team, TeamRating, TeamStatistics
+from services.cache_service import bump_generation
+
+
+EVENT_LOG_DIR = os.getenv(
+    "EVENT_LOG_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'event_log'),
+)
+SEGMENT_MAX_EVENTS = int(os.getenv("EVENT_LOG_SEGMENT_EVENTS", "10000"))
+SNAPSHOT_INTERVAL = int(os.getenv("EVENT_LOG_SNAPSHOT_INTERVAL", "500"))
+
+SEGMENT_PREFIX = 'events-'
+SNAPSHOT_PREFIX = 'snapshot-'
+
+
+class EventLog:
+    """Numbered NDJSON segments plus JSON snapshots in one directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        names = [n for n in os.listdir(self.directory) if n.startswith(SEGMENT_PREFIX) and n.endswith('.ndjson')]
+        return sorted(os.path.join(self.directory, n) for n in names)
+
+    def _snapshots(self):
+        if not os.path.isdir(self.directory):
+            return []
+        names = [n for n in os.listdir(self.directory) if n.startswith(SNAPSHOT_PREFIX) and n.endswith('.json')]
+        return sorted(os.path.join(self.directory, n) for n in names)
+
+    @staticmethod
+    def _segment_start(path):
+        return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len('.ndjson')])
+
+    @staticmethod
+    def _last_record(path):
+        """Read the last complete line of a segment without scanning the whole file"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - 65536, 0))
+            lines = [line for line in f.read().split(b'\n') if line.strip()]
+        for line in reversed(lines):
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+        return None
+
+    @contextmanager
+    def locked(self):
+        """Hold the log exclusively, across threads and (with fcntl) worker processes"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def append_locked(self, kind, payload):
+        """Append one record and return its sequence number; the caller holds locked()"""
+        segments = self._segments()
+        last = self._last_record(segments[-1]) if segments else None
+        seq = (last['seq'] if last else 0) + 1
+
+        if not segments or seq - self._segment_start(segments[-1]) >= SEGMENT_MAX_EVENTS:
+            path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:012d}.ndjson")
+        else:
+            path = segments[-1]
+
+        record = {'seq': seq, 'ts': datetime.utcnow().isoformat(), 'kind': kind, 'payload': payload}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return seq
+
+    def append(self, kind, payload):
+        """Append one record and return its sequence number"""
+        with self.locked():
+            return self.append_locked(kind, payload)
+
+    def read(self, after_seq=0):
+        """Yield records with seq > after_seq, skipping whole segments that end before it"""
+        segments = self._segments()
+        for idx, path in enumerate(segments):
+            if idx + 1 < len(segments) and self._segment_start(segments[idx + 1]) <= after_seq + 1:
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write
+                        continue
+                    if record['seq'] > after_seq:
+                        yield record
+
+    def last_seq(self):
+        segments = self._segments()
+        last = self._last_record(segments[-1]) if segments else None
+        return last['seq'] if last else 0
+
+    def write_snapshot(self, seq, state):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{seq:012d}.json")
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'seq': seq, 'taken_at': datetime.utcnow().isoformat(), 'state': state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    def latest_snapshot(self):
+        snapshots = self._snapshots()
+        if not snapshots:
+            return 0, None
+        with open(snapshots[-1], encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return snapshot['seq'], snapshot['state']
+
+
+event_log = EventLog(EVENT_LOG_DIR)
+
+
+def _columns(obj, exclude):
+    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns if c.name not in exclude}
+
+
+def capture_state():
+    """
+    Serialize the aggregate tables keyed by stable external ids (Team.team_id,
+    Player.player_id, Match.event_id), so a snapshot survives a re-import that
+    reassigns primary keys.
+    """
+    team_keys = {team.id: team.team_id for team in Team.query.all()}
+    player_keys = {player.id: player.player_id for player in Player.query.all()}
+    match_keys = {}
+
+    matches = []
+    for match in Match.query.all():
+        match_keys[match.id] = match.event_id
+        row = _columns(match, {'id', 'home_team_id', 'away_team_id', 'pair_low_team_id', 'pair_high_team_id'})
+        row['home_team_key'] = team_keys.get(match.home_team_id)
+        row['away_team_key'] = team_keys.get(match.away_team_id)
+        matches.append(row)
+
+    team_statistics = []
+    for stats in TeamStatistics.query.all():
+        row = _columns(stats, {'id', 'team_id'})
+        row['team_key'] = team_keys.get(stats.team_id)
+        team_statistics.append(row)
+
+    player_statistics = []
+    for stats in PlayerStatistics.query.all():
+        row = _columns(stats, {'id', 'player_id'})
+        row['player_key'] = player_keys.get(stats.player_id)
+        player_statistics.append(row)
+
+    match_goals = [
+        {
+            'event_id': match_keys.get(goal.match_id),
+            'team_key': team_keys.get(goal.team_id),
+            'minute': goal.minute,
+            'added_time': goal.added_time,
+        }
+        for goal in MatchGoal.query.all()
+    ]
+
+    return {
+        'matches': matches,
+        'team_statistics': team_statistics,
+        'player_statistics': player_statistics,
+        'match_goals': match_goals,
+    }
+
+
+def restore_state(state):
+    """Replace the aggregate tables with a captured state; teams and players must exist"""
+    from services.rating_service import rebuild_ratings
+    from services.standings_service import rebuild_standings
+
+    team_ids = {team.team_id: team.id for team in Team.query.all()}
+    player_ids = {player.player_id: player.id for player in Player.query.all()}
+
+    TeamRating.query.delete()
+    Standing.query.delete()
+    MatchGoal.query.delete()
+
+    existing = {match.event_id: match for match in Match.query.all()}
+    kept = set()
+    for row in state['matches']:
+        row = dict(row)
+        home_id = team_ids.get(row.pop('home_team_key'))
+        away_id = team_ids.get(row.pop('away_team_key'))
+        match = existing.get(row['event_id']) or Match()
+        for key, value in row.items():
+            setattr(match, key, value)
+        match.home_team_id = home_id
+        match.away_team_id = away_id
+        match.update_pair_key()
+        db.session.add(match)
+        kept.add(row['event_id'])
+    for event_id, match in existing.items():
+        if event_id not in kept:
+            db.session.delete(match)
+    db.session.flush()
+
+    for model, key_field, id_map, fk, rows in (
+        (TeamStatistics, 'team_key', team_ids, 'team_id', state['team_statistics']),
+        (PlayerStatistics, 'player_key', player_ids, 'player_id', state['player_statistics']),
+    ):
+        current = {getattr(obj, fk): obj for obj in model.query.all()}
+        for row in rows:
+            row = dict(row)
+            target_id = id_map.get(row.pop(key_field))
+            if target_id is None:
+                continue
+            obj = current.get(target_id) or model(**{fk: target_id})
+            for key, value in row.items():
+                setattr(obj, key, value)
+            db.session.add(obj)
+
+    match_ids = {match.event_id: match.id for match in Match.query.all()}
+    for goal in state['match_goals']:
+        match_id = match_ids.get(goal['event_id'])
+        team_id = team_ids.get(goal['team_key'])
+        if match_id and team_id:
+            db.session.add(MatchGoal(match_id=match_id, team_id=team_id,
+                                     minute=goal['minute'], added_time=goal['added_time']))
+
+    db.session.flush()
+    rebuild_standings(commit=False)
+    rebuild_ratings(commit=False)
+    db.session.commit()
+    bump_generation()
+
+
+def take_snapshot():
+    """Snapshot the current aggregate state as of the latest log sequence"""
+    with event_log.locked():
+        seq = event_log.last_seq()
+        return event_log.write_snapshot(seq, capture_state())
+
+
+@contextmanager
+def record(kind, payload):
+    """
+    Write-ahead a live update around the block that commits it.
+    The record is appended and the log stays locked until the block finishes,
+    so concurrent writers log in commit order. If the block raises, an abort
+    record cancels the entry. Every SNAPSHOT_INTERVAL events the state is
+    snapshotted before the lock is released, so it holds exactly the events
+    up to its seq.
+    """
+    with event_log.locked():
+        seq = event_log.append_locked(kind, payload)
+        try:
+            yield seq
+        except BaseException:
+            event_log.append_locked('abort', {'seq': seq})
+            raise
+        if SNAPSHOT_INTERVAL and seq % SNAPSHOT_INTERVAL == 0:
+            event_log.write_snapshot(seq, capture_state())
+
+
+def recover():
+    """
+    Rebuild state from the latest snapshot plus the log tail.
+    Without a snapshot the CSV import is the base and the whole log is replayed.
+    """
+    from services.live_ingestion_service import ingest_match_event, ingest_match_result, IngestionError
+
+    seq, state = event_log.latest_snapshot()
+    if state is None:
+        from services.clean_csv_import import clean_import_from_csv
+        clean_import_from_csv()
+    else:
+        restore_state(state)
+
+    entries = list(event_log.read(after_seq=seq))
+    aborted = {entry['payload']['seq'] for entry in entries if entry['kind'] == 'abort'}
+
+    replayed = 0
+    skipped = 0
+    for entry in entries:
+        if entry['kind'] == 'abort' or entry['seq'] in aborted:
+            continue
+        handler = ingest_match_result if entry['kind'] == 'result' else ingest_match_event
+        try:
+            handler(entry['payload'], log=False)
+            replayed += 1
+        except IngestionError:
+            skipped += 1
+
+    return {'snapshot_seq': seq, 'replayed': replayed, 'skipped': skipped}
@@ -0,0 +1,118 @@
+"""
+Goal timing aggregations.
+Goal minutes are parsed once at import into the match_goals table and every
+histogram is a single GROUP BY over it, cached per data generation.
+"""
+
+from sqlalchemy import case, func
+
+from extensions import db
+from models import MatchGoal, Team
+from services.cache_service import cached
+
+
+REGULATION_MINUTES = 90
+
+
+def parse_goal_timings(value):
+    """
+    Parse a goal timings string such as "14,40,45'2,65" into (minute, added_time) pairs.
+    Blank, NaN and malformed entries are skipped.
+    """
+    if not isinstance(value, str):
+        return []
+
+    goals = []
+    for token in value.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        minute, _, added = token.partition("'")
+        try:
+            goals.append((max(int(minute), 1), int(added) if added else 0))
+        except ValueError:
+            continue
+    return goals
+
+
+def _bucket_expression(bucket):
+    # Minutes 1..bucket fall in bucket 0, added time counts toward the minute it extends
+    return (MatchGoal.minute - 1) // bucket
+
+
+def _period_expression():
+    return case(
+        (MatchGoal.minute <= 45, 'first_half'),
+        (MatchGoal.minute <= REGULATION_MINUTES, 'second_half'),
+        else_='extra_time',
+    )
+
+
+def _histogram(counts, bucket):
+    """Turn {bucket index: goals} into contiguous buckets covering at least regulation time"""
+    last = max([(REGULATION_MINUTES - 1) // bucket] + list(counts))
+    return [
+        {
+            'from': idx * bucket + 1,
+            'to': (idx + 1) * bucket,
+            'goals': int(counts.get(idx, 0)),
+        }
+        for idx in range(last + 1)
+    ]
+
+
+@cached("goal_timing_histogram")
+def get_goal_histogram(bucket=15, team_id=None):
+    bucket_idx = _bucket_expression(bucket)
+    query = db.session.query(bucket_idx.label('bucket'), func.count(MatchGoal.id))
+    if team_id is not None:
+        query = query.filter(MatchGoal.team_id == team_id)
+    counts = dict(query.group_by('bucket').all())
+
+    return {
+        'bucket_minutes': bucket,
+        'total_goals': int(sum(counts.values())),
+        'buckets': _histogram(counts, bucket),
+    }
+
+
+@cached("goal_timing_halves")
+def get_goal_halves(team_id=None):
+    period = _period_expression()
+    query = db.session.query(period.label('period'), func.count(MatchGoal.id))
+    if team_id is not None:
+        query = query.filter(MatchGoal.team_id == team_id)
+    counts = dict(query.group_by('period').all())
+
+    return {
+        'total_goals': int(sum(counts.values())),
+        'first_half': int(counts.get('first_half', 0)),
+        'second_half': int(counts.get('second_half', 0)),
+        'extra_time': int(counts.get('extra_time', 0)),
+    }
+
+
+@cached("goal_timing_by_team")
+def get_goal_histograms_by_team(bucket=15):
+    bucket_idx = _bucket_expression(bucket)
+    rows = db.session.query(
+        MatchGoal.team_id, bucket_idx.label('bucket'), func.count(MatchGoal.id)
+    ).group_by(MatchGoal.team_id, 'bucket').all()
+
+    per_team = {}
+    for team_id, idx, goals in rows:
+        per_team.setdefault(team_id, {})[idx] = goals
+
+    teams = Team.query.order_by(Team.id).all()
+    return {
+        'bucket_minutes': bucket,
+        'teams': [
+            {
+                'team_id': team.id,
+                'name': team.name,
+                'total_goals': int(sum(per_team.get(team.id, {}).values())),
+                'buckets': _histogram(per_team.get(team.id, {}), bucket),
+            }
+            for team in teams
+        ],
+    }
@@ -0,0 +1,111 @@
+"""
+Persistent on-disk HTTP cache for upstream API responses.
+Bodies are stored per URL with their validators (ETag, Last-Modified) and an
+expiry taken from Cache-Control max-age, never shorter than the configured
+minimum TTL. Fresh entries are served without a request; stale ones are
+revalidated with a conditional GET. Each entry carries the body's content
+hash so callers can tell an unchanged payload from a changed one.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+HTTP_CACHE_DIR = os.getenv(
+    "HTTP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'http_cache'),
+)
+HTTP_CACHE_MIN_TTL = float(os.getenv("HTTP_CACHE_MIN_TTL", "300"))
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+class HttpCache:
+    """One JSON file per URL holding the body, validators and expiry"""
+
+    def __init__(self, directory, min_ttl=HTTP_CACHE_MIN_TTL):
+        self.directory = directory
+        self.min_ttl = min_ttl
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _write(self, url, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def get(self, url):
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry is not None and time.time() < entry['expires_at']
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _expires_at(self, response):
+        directives = _parse_cache_control(response.headers.get('Cache-Control'))
+        max_age = 0
+        if 'no-cache' not in directives:
+            try:
+                max_age = float(directives.get('max-age', 0))
+            except ValueError:
+                max_age = 0
+        return time.time() + max(max_age, self.min_ttl)
+
+    def store(self, url, response):
+        """Record a 200 response and return its entry (not persisted when marked no-store)"""
+        body = response.content
+        entry = {
+            'url': url,
+            'body': body.decode('utf-8'),
+            'content_hash': content_hash(body),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'expires_at': self._expires_at(response),
+        }
+        if 'no-store' not in _parse_cache_control(response.headers.get('Cache-Control')):
+            self._write(url, entry)
+        return entry
+
+    def revalidated(self, url, entry, response):
+        """Refresh expiry and validators after a 304 Not Modified"""
+        entry = dict(entry)
+        entry['expires_at'] = self._expires_at(response)
+        entry['etag'] = response.headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = response.headers.get('Last-Modified') or entry.get('last_modified')
+        self._write(url, entry)
+        return entry
+
+
+http_cache = HttpCache(HTTP_CACHE_DIR)
@@ -0,0 +1,269 @@
+"""
+Live match ingestion.
+Applies a match result or in-match event as a delta to the affected team and
+player statistics, standings and ratings inside one transaction, then bumps
+the cache generation. No CSV reload is involved.
+"""
+
+from contextlib import nullcontext
+
+from extensions import db
+from models import Match, MatchGoal, Player, PlayerStatistics, TeamStatistics
+from services.cache_service import bump_generation
+from services.db_data_service import find_team
+from services.event_log_service import record
+from services.rating_service import apply_match_rating, correct_match_rating
+from services import standings_service
+
+
+EVENT_TYPES = ('goal', 'own_goal', 'penalty_goal', 'yellow_card', 'red_card', 'substitution', 'final_whistle')
+
+
+class IngestionError(ValueError):
+    """Raised when a live payload cannot be applied"""
+
+
+def apply_team_result(team_id, goals_for, goals_against, sign):
+    stats = TeamStatistics.query.filter_by(team_id=team_id).first()
+    if not stats:
+        stats = TeamStatistics(
+            team_id=team_id, matches_played=0, wins=0, draws=0, losses=0,
+            goals_scored=0, goals_conceded=0, clean_sheets=0,
+        )
+        db.session.add(stats)
+
+    stats.matches_played = (stats.matches_played or 0) + sign
+    stats.goals_scored = (stats.goals_scored or 0) + sign * goals_for
+    stats.goals_conceded = (stats.goals_conceded or 0) + sign * goals_against
+    if goals_for > goals_against:
+        stats.wins = (stats.wins or 0) + sign
+    elif goals_for == goals_against:
+        stats.draws = (stats.draws or 0) + sign
+    else:
+        stats.losses = (stats.losses or 0) + sign
+    if goals_against == 0:
+        stats.clean_sheets = (stats.clean_sheets or 0) + sign
+    stats.calculate_metrics()
+
+
+def _apply_score(match, home_score, away_score):
+    """Move a match from its stored score to a new one, updating every derived aggregate"""
+    previous = (match.home_score, match.away_score)
+    counted = None not in previous
+    if counted and previous == (home_score, away_score):
+        return False
+
+    if counted:
+        apply_team_result(match.home_team_id, previous[0], previous[1], -1)
+        apply_team_result(match.away_team_id, previous[1], previous[0], -1)
+    apply_team_result(match.home_team_id, home_score, away_score, 1)
+    apply_team_result(match.away_team_id, away_score, home_score, 1)
+
+    match.home_score = home_score
+    match.away_score = away_score
+    db.session.flush()
+
+    standings_service.apply_match_result(match, previous if counted else None, commit=False)
+    if counted:
+        correct_match_rating(match, commit=False)
+    else:
+        apply_match_rating(match, commit=False)
+    return True
+
+
+def _resolve_match(payload, create=False):
+    match = None
+    if payload.get('match_id'):
+        match = Match.query.get(payload['match_id'])
+    elif payload.get('event_id'):
+        match = Match.query.filter_by(event_id=str(payload['event_id'])).first()
+    if match:
+        return match
+    if not create or not payload.get('event_id'):
+        raise IngestionError("Match not found; provide match_id or event_id")
+
+    home = find_team(payload.get('home_team'))
+    away = find_team(payload.get('away_team'))
+    if not home or not away:
+        raise IngestionError("New matches need known home_team and away_team")
+
+    match = Match(
+        event_id=str(payload['event_id']),
+        season=payload.get('season'),
+        stage=payload.get('stage'),
+        date=payload.get('date'),
+        home_team=home.name,
+        away_team=away.name,
+        home_team_id=home.id,
+        away_team_id=away.id,
+        venue=payload.get('venue'),
+    )
+    match.update_pair_key()
+    db.session.add(match)
+    db.session.flush()
+    return match
+
+
+def _player_pk(payload, field):
+    """
+    Primary key of the player in payload[field], or of the player whose
+    external Player.player_id is in the logged '<name>_key' form of the field
+    """
+    key = payload.get(field.replace('_id', '_key'))
+    if key is None:
+        return payload.get(field)
+    player = Player.query.filter_by(player_id=str(key)).first()
+    if not player:
+        raise IngestionError(f"Player '{key}' not found")
+    return player.id
+
+
+def _player_stats(player_id):
+    if not player_id:
+        return None
+    stats = PlayerStatistics.query.filter_by(player_id=player_id).first()
+    if stats:
+        return stats
+    player = Player.query.get(player_id)
+    if not player:
+        raise IngestionError(f"Player '{player_id}' not found")
+    stats = PlayerStatistics(
+        player_id=player.id, position=player.position, appearances_overall=0, minutes_played_overall=0,
+        goals_overall=0, assists_overall=0, shots_on_target=0, shots_total=0, tackles_overall=0,
+        interceptions_overall=0, yellow_cards_overall=0, red_cards_overall=0,
+    )
+    db.session.add(stats)
+    return stats
+
+
+def _parse_score(payload, key):
+    try:
+        value = int(payload[key])
+    except (KeyError, TypeError, ValueError):
+        raise IngestionError(f"'{key}' must be a non-negative integer")
+    if value < 0:
+        raise IngestionError(f"'{key}' must be a non-negative integer")
+    return value
+
+
+def _parse_minute(payload):
+    """The goal minute and added time, or None when the payload has no minute"""
+    if payload.get('minute') is None:
+        return None
+    minute = _parse_score(payload, 'minute')
+    added_time = _parse_score(payload, 'added_time') if payload.get('added_time') is not None else 0
+    return max(minute, 1), added_time
+
+
+def _loggable(payload, match, players=()):
+    """
+    Log matches by event_id and players by Player.player_id, which survive
+    re-imports, rather than by primary key
+    """
+    entry = {key: value for key, value in payload.items() if key != 'match_id'}
+    entry['event_id'] = match.event_id
+    for field, player_id in players:
+        entry.pop(field, None)
+        if player_id:
+            entry[field.replace('_id', '_key')] = Player.query.get(player_id).player_id
+    return entry
+
+
+def _commit(changed, kind, entry):
+    """Commit the session; entry is written ahead to the event log unless it is None (replay)"""
+    with record(kind, entry) if entry is not None else nullcontext():
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    if changed:
+        bump_generation()
+
+
+def ingest_match_result(payload, log=True):
+    """
+    Apply a full-time (or current) score.
+    payload: {event_id | match_id, home_score, away_score} plus home_team,
+    away_team, date, stage and venue when the match is new.
+    Applied payloads are appended to the event log unless log is False (replay).
+    """
+    try:
+        home_score = _parse_score(payload, 'home_score')
+        away_score = _parse_score(payload, 'away_score')
+        match = _resolve_match(payload, create=True)
+        changed = _apply_score(match, home_score, away_score)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    _commit(changed, 'result', _loggable(payload, match) if log else None)
+    return {'match_id': match.id, 'event_id': match.event_id, 'home_score': match.home_score,
+            'away_score': match.away_score, 'updated': changed}
+
+
+def ingest_match_event(payload, log=True):
+    """
+    Apply one in-match event.
+    payload: {event_id | match_id, type, team, player_id, assist_player_id, minute, added_time}
+    Goals move the score (own goals count for the other side) and credit the
+    scorer and assister; cards are credited to the player. Substitutions and
+    the final whistle change no aggregate and are only logged.
+    """
+    try:
+        event_type = payload.get('type')
+        if event_type not in EVENT_TYPES:
+            raise IngestionError(f"Unknown event type '{event_type}', expected one of: {', '.join(EVENT_TYPES)}")
+
+        timing = _parse_minute(payload)
+        match = _resolve_match(payload)
+        players = [(field, _player_pk(payload, field)) for field in ('player_id', 'assist_player_id')]
+        scorer = _player_stats(players[0][1])
+
+        if event_type in ('goal', 'own_goal', 'penalty_goal'):
+            team = find_team(payload.get('team'))
+            if not team or team.id not in (match.home_team_id, match.away_team_id):
+                raise IngestionError("'team' must be one of the two teams in the match")
+
+            # 'team' is the side that benefits, also for own goals
+            home_score = match.home_score or 0
+            away_score = match.away_score or 0
+            if team.id == match.home_team_id:
+                home_score += 1
+            else:
+                away_score += 1
+            _apply_score(match, home_score, away_score)
+
+            if timing:
+                db.session.add(MatchGoal(
+                    match_id=match.id,
+                    team_id=team.id,
+                    minute=timing[0],
+                    added_time=timing[1],
+                ))
+
+            if scorer and event_type != 'own_goal':
+                scorer.goals_overall = (scorer.goals_overall or 0) + 1
+            assister = _player_stats(players[1][1])
+            if assister and event_type != 'own_goal':
+                assister.assists_overall = (assister.assists_overall or 0) + 1
+                assister.calculate_metrics()
+        elif event_type in ('substitution', 'final_whistle'):
+            pass
+        elif not scorer:
+            raise IngestionError("Card events need a player_id")
+        elif event_type == 'yellow_card':
+            scorer.yellow_cards_overall = (scorer.yellow_cards_overall or 0) + 1
+        else:
+            scorer.red_cards_overall = (scorer.red_cards_overall or 0) + 1
+
+        if scorer:
+            scorer.calculate_metrics()
+        entry = _loggable(payload, match, players) if log else None
+    except Exception:
+        db.session.rollback()
+        raise
+
+    _commit(True, 'event', entry)
+    return {'match_id': match.id, 'event_id': match.event_id, 'type': event_type,
+            'home_score': match.home_score, 'away_score': match.away_score}
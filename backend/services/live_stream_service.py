@@ -0,0 +1,159 @@
+"""
+Server-Sent Events broadcaster for live scores and standings.
+One background thread wakes when the data generation advances, diffs match
+scores and standings against the previous generation once, and appends the
+resulting messages to a shared ring buffer. Subscribers only keep a cursor
+into that buffer, so an idle connection costs no computation.
+
+Served by the gevent server in gunicorn_sse.conf.py, each connection is a
+greenlet rather than a worker thread.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+from extensions import db
+from models import Match
+from services.cache_service import add_generation_listener, get_generation
+from services.standings_service import get_stages, get_standings_table
+
+
+HEARTBEAT_SECONDS = 15
+# How often the producer checks the stored generation for bumps made by other
+# processes (the API workers, when streams are served by a separate server)
+POLL_SECONDS = float(os.getenv("LIVE_STREAM_POLL_SECONDS", "1"))
+HISTORY_SIZE = 512
+
+
+def _format(event, data, message_id=None):
+    frame = f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    return f"id: {message_id}\n{frame}" if message_id is not None else frame
+
+
+class Broadcaster:
+    """
+    Fans out diffs to any number of SSE subscribers from one producer thread.
+    Each generation's diffs form one batch whose closing 'generation' message
+    carries the generation as its event id. Generations are shared by every
+    process, so a client can resume with Last-Event-ID on any worker or server,
+    and a batch cut off mid-way is sent again in full.
+    """
+
+    def __init__(self, history=HISTORY_SIZE):
+        self._cond = threading.Condition()
+        # (generation before, generation, frames)
+        self._batches = deque(maxlen=history)
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._generation = None
+        self._scores = {}
+        self._standings = {}
+
+    def start(self, app):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            with app.app_context():
+                self._generation = get_generation()
+                self._scores, self._standings = self._capture()
+                db.session.remove()
+            add_generation_listener(lambda _generation: self._wake.set())
+            self._thread = threading.Thread(target=self._run, args=(app,), name="sse-broadcaster", daemon=True)
+            self._thread.start()
+
+    def publish(self, generation, messages):
+        """Append one generation's (event, data) messages as a batch"""
+        frames = [_format(event, data) for event, data in messages]
+        frames.append(_format('generation', {'generation': generation}, message_id=generation))
+        with self._cond:
+            self._batches.append((self._generation, generation, ''.join(frames)))
+            self._generation = generation
+            self._cond.notify_all()
+
+    @staticmethod
+    def _capture():
+        scores = {
+            event_id: (home_score, away_score, home_team, away_team)
+            for event_id, home_score, away_score, home_team, away_team in db.session.query(
+                Match.event_id, Match.home_score, Match.away_score, Match.home_team, Match.away_team
+            )
+        }
+        standings = {
+            stage: {row['name']: (row['position'], row['points'], row['matches_played']) for row in get_standings_table(stage)}
+            for stage in get_stages()
+        }
+        return scores, standings
+
+    def _run(self, app):
+        while True:
+            # Local bumps wake the producer at once; others are seen on the next poll
+            self._wake.wait(timeout=POLL_SECONDS)
+            self._wake.clear()
+            with app.app_context():
+                generation = get_generation()
+            if generation == self._generation:
+                continue
+
+            with app.app_context():
+                try:
+                    scores, standings = self._capture()
+                finally:
+                    db.session.remove()
+
+            messages = []
+            for event_id, score in scores.items():
+                if self._scores.get(event_id) != score:
+                    messages.append(('match', {
+                        'event_id': event_id,
+                        'home_team': score[2],
+                        'away_team': score[3],
+                        'home_score': score[0],
+                        'away_score': score[1],
+                    }))
+
+            for stage, table in standings.items():
+                previous = self._standings.get(stage, {})
+                changed = [
+                    {'name': name, 'position': row[0], 'points': row[1], 'matches_played': row[2]}
+                    for name, row in table.items() if previous.get(name) != row
+                ]
+                if changed:
+                    changed.sort(key=lambda row: row['position'])
+                    messages.append(('standings', {'stage': stage, 'rows': changed}))
+
+            self._scores, self._standings = scores, standings
+            self.publish(generation, messages)
+
+    def _buffered_since(self):
+        """The oldest generation a client can resume from without missing a batch"""
+        return self._batches[0][0] if self._batches else self._generation
+
+    def subscribe(self, last_event_id=None):
+        """Generator of SSE frames, resuming after the generation in last_event_id when still buffered"""
+        with self._cond:
+            cursor = self._generation
+            if last_event_id is not None:
+                # An id older than the buffer (or newer than this process has seen) makes the first read resync
+                cursor = last_event_id
+
+        yield f"retry: 3000\nevent: hello\ndata: {json.dumps({'generation': self._generation})}\n\n"
+        while True:
+            with self._cond:
+                if self._generation == cursor:
+                    self._cond.wait(timeout=HEARTBEAT_SECONDS)
+                if not self._buffered_since() <= cursor <= self._generation:
+                    # Missed batches that are no longer buffered: tell the client to refetch full state
+                    pending = ["event: resync\ndata: {}\n\n"]
+                else:
+                    pending = [frames for _before, generation, frames in self._batches if generation > cursor]
+                cursor = self._generation
+            if pending:
+                yield ''.join(pending)
+            else:
+                yield ": keep-alive\n\n"
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,152 @@
+"""
+Player percentile rankings.
+Each metric is pre-sorted once per position category and a player's
+percentile is answered by binary search. Populations with a minimum-minutes
+threshold are sorted per request from the cached metric table.
+"""
+
+import numpy as np
+
+from extensions import db
+from models import Player, PlayerStatistics
+from services.cache_service import cached, get_cached
+from services.csv_data_service import get_position_category
+
+
+PLAYER_METRICS = [
+    'appearances_overall',
+    'minutes_played_overall',
+    'goals_overall',
+    'assists_overall',
+    'goals_per_90',
+    'assists_per_90',
+    'shots_total',
+    'shots_on_target',
+    'efficiency_rating',
+    'tackles_overall',
+    'interceptions_overall',
+    'defensive_actions_per_90',
+    'pass_completion_rate',
+    'average_rating',
+    'yellow_cards_overall',
+    'red_cards_overall',
+]
+
+POSITION_CATEGORIES = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward', 'Unknown']
+
+
+class PlayerMetricTable:
+    """Column-oriented snapshot of every player's metric values"""
+
+    def __init__(self, rows):
+        self.ids = np.array([player.id for player, _ in rows], dtype=np.int64)
+        self.names = [player.name for player, _ in rows]
+        self.categories = np.array([
+            get_position_category((stats.position if stats else None) or player.position)
+            for player, stats in rows
+        ], dtype=object)
+        self.values = np.array([
+            [float(getattr(stats, metric) or 0) if stats else 0.0 for metric in PLAYER_METRICS]
+            for _, stats in rows
+        ], dtype=np.float64).reshape(len(rows), len(PLAYER_METRICS))
+        self.minutes = self.values[:, PLAYER_METRICS.index('minutes_played_overall')]
+        self.row_of = {int(player_id): idx for idx, player_id in enumerate(self.ids)}
+
+    def mask(self, category=None, min_minutes=0):
+        selected = self.minutes >= min_minutes
+        if category:
+            selected &= self.categories == category
+        return selected
+
+
+class PercentilePopulation:
+    """Sorted metric columns for one population of players"""
+
+    def __init__(self, values):
+        self.size = values.shape[0]
+        # One contiguous sorted row per metric keeps each binary search cache-friendly
+        self.sorted = np.ascontiguousarray(np.sort(values.T, axis=1))
+
+    def percentile(self, metric_idx, value):
+        """Percentile rank of value: share of the population below it, counting ties as half"""
+        if self.size == 0:
+            return None
+        column = self.sorted[metric_idx]
+        below = np.searchsorted(column, value, side='left')
+        at_or_below = np.searchsorted(column, value, side='right')
+        return round(float((below + at_or_below) / 2 / self.size * 100), 1)
+
+
+@cached("player_metric_table")
+def load_player_metric_table():
+    rows = db.session.query(Player, PlayerStatistics).outerjoin(
+        PlayerStatistics, PlayerStatistics.player_id == Player.id
+    ).order_by(Player.id).all()
+    return PlayerMetricTable(rows)
+
+
+def get_population(category=None, min_minutes=0):
+    table = load_player_metric_table()
+    if min_minutes <= 0:
+        # Cached per category only, so client-chosen thresholds cannot grow the cache
+        return get_cached(
+            ("percentile_population", category),
+            lambda: PercentilePopulation(table.values[table.mask(category)]),
+        )
+    # A few hundred rows per category: filtering and sorting per request is cheap
+    return PercentilePopulation(table.values[table.mask(category, min_minutes)])
+
+
+def resolve_population(population, player_category):
+    """Map the population query parameter to a position category (None means all players)"""
+    population = (population or 'position').strip().lower()
+    if population == 'all':
+        return None
+    if population == 'position':
+        return player_category
+    for category in POSITION_CATEGORIES:
+        if population in (category.lower(), category.lower() + 's'):
+            return category
+    raise ValueError(f"Unknown population '{population}'")
+
+
+def get_player_percentiles(player_id, population='position', min_minutes=0, metrics=None):
+    """
+    Percentile profile of one player against a population.
+    Returns None when the player does not exist; raises ValueError for an
+    unknown population or metric.
+    """
+    table = load_player_metric_table()
+    row = table.row_of.get(player_id)
+    if row is None:
+        return None
+
+    metrics = metrics or PLAYER_METRICS
+    unknown = [metric for metric in metrics if metric not in PLAYER_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+
+    player_category = table.categories[row]
+    category = resolve_population(population, player_category)
+    ranked = get_population(category, min_minutes)
+
+    percentiles = {}
+    for metric in metrics:
+        idx = PLAYER_METRICS.index(metric)
+        value = float(table.values[row, idx])
+        percentiles[metric] = {
+            'value': round(value, 2),
+            'percentile': ranked.percentile(idx, value),
+        }
+
+    return {
+        'player_id': player_id,
+        'name': table.names[row],
+        'position_category': player_category,
+        'population': {
+            'position_category': category or 'All',
+            'min_minutes': min_minutes,
+            'size': ranked.size,
+        },
+        'percentiles': percentiles,
+    }
@@ -0,0 +1,231 @@
+"""
+Elo team ratings.
+Matches are processed in date order and every result stores a rating
+checkpoint per team, so a new result only needs the two latest checkpoints
+instead of a replay of the whole history.
+"""
+
+import os
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Match, Team, TeamRating
+from services.db_data_service import parse_match_date
+
+
+INITIAL_RATING = 1500.0
+K_FACTOR = float(os.getenv("ELO_K_FACTOR", "40"))
+HOME_ADVANTAGE = float(os.getenv("ELO_HOME_ADVANTAGE", "0"))
+GOAL_DIFFERENCE_WEIGHTING = os.getenv("ELO_GOAL_DIFFERENCE_WEIGHTING", "true").lower() == "true"
+
+
+def expected_score(rating, opponent_rating, advantage=0.0):
+    return 1 / (1 + 10 ** ((opponent_rating - rating - advantage) / 400))
+
+
+def goal_difference_multiplier(goal_difference):
+    """World Football Elo margin-of-victory weighting"""
+    if not GOAL_DIFFERENCE_WEIGHTING:
+        return 1.0
+    margin = abs(goal_difference)
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+
+def rate_match(home_rating, away_rating, home_score, away_score):
+    """Return the (home, away) ratings after a result"""
+    home_score, away_score = int(home_score), int(away_score)
+    expected_home = expected_score(home_rating, away_rating, HOME_ADVANTAGE)
+    if home_score > away_score:
+        actual_home = 1.0
+    elif home_score < away_score:
+        actual_home = 0.0
+    else:
+        actual_home = 0.5
+
+    change = K_FACTOR * goal_difference_multiplier(home_score - away_score) * (actual_home - expected_home)
+    return home_rating + change, away_rating - change
+
+
+def _is_rateable(match):
+    return (
+        match.home_team_id and match.away_team_id
+        and match.home_score is not None and match.away_score is not None
+    )
+
+
+def _latest_checkpoint(team_id):
+    return TeamRating.query.filter_by(team_id=team_id).order_by(TeamRating.sequence.desc()).first()
+
+
+def rebuild_ratings(commit=True):
+    """Replay every completed match in date order and rewrite all checkpoints"""
+    TeamRating.query.delete()
+
+    matches = [m for m in Match.query.all() if _is_rateable(m)]
+    matches.sort(key=lambda m: (parse_match_date(m.date) or parse_match_date('9999-12-31'), m.id))
+
+    ratings = {}
+    sequences = {}
+    checkpoints = []
+    for match in matches:
+        played_at = parse_match_date(match.date)
+        home_before = ratings.get(match.home_team_id, INITIAL_RATING)
+        away_before = ratings.get(match.away_team_id, INITIAL_RATING)
+        home_after, away_after = rate_match(home_before, away_before, match.home_score, match.away_score)
+
+        for team_id, opponent_id, before, after in (
+            (match.home_team_id, match.away_team_id, home_before, home_after),
+            (match.away_team_id, match.home_team_id, away_before, away_after),
+        ):
+            sequences[team_id] = sequences.get(team_id, 0) + 1
+            ratings[team_id] = after
+            checkpoints.append(TeamRating(
+                team_id=team_id,
+                match_id=match.id,
+                opponent_id=opponent_id,
+                sequence=sequences[team_id],
+                played_at=played_at,
+                rating_before=before,
+                rating_after=after,
+            ))
+
+    db.session.add_all(checkpoints)
+    if commit:
+        db.session.commit()
+    return len(matches)
+
+
+def apply_match_rating(match, commit=True):
+    """
+    Rate one newly completed match from the latest checkpoints.
+    A match older than either team's latest checkpoint changes history, so
+    that case falls back to a full rebuild.
+    """
+    if not _is_rateable(match):
+        return False
+    if TeamRating.query.filter_by(match_id=match.id).first():
+        return False
+
+    played_at = parse_match_date(match.date)
+    home_last = _latest_checkpoint(match.home_team_id)
+    away_last = _latest_checkpoint(match.away_team_id)
+
+    for last in (home_last, away_last):
+        if last and played_at and last.played_at and played_at < last.played_at:
+            rebuild_ratings(commit=commit)
+            return True
+
+    home_before = home_last.rating_after if home_last else INITIAL_RATING
+    away_before = away_last.rating_after if away_last else INITIAL_RATING
+    home_after, away_after = rate_match(home_before, away_before, match.home_score, match.away_score)
+
+    db.session.add(TeamRating(
+        team_id=match.home_team_id,
+        match_id=match.id,
+        opponent_id=match.away_team_id,
+        sequence=(home_last.sequence if home_last else 0) + 1,
+        played_at=played_at,
+        rating_before=home_before,
+        rating_after=home_after,
+    ))
+    db.session.add(TeamRating(
+        team_id=match.away_team_id,
+        match_id=match.id,
+        opponent_id=match.home_team_id,
+        sequence=(away_last.sequence if away_last else 0) + 1,
+        played_at=played_at,
+        rating_before=away_before,
+        rating_after=away_after,
+    ))
+    if commit:
+        db.session.commit()
+    return True
+
+
+def correct_match_rating(match, commit=True):
+    """
+    Re-rate a match whose score was corrected.
+    The old rating change is reversed and the new one applied on the match's
+    own checkpoints, and every later checkpoint of either team shifts by the
+    same difference. Later expected scores are not re-derived; a full
+    rebuild_ratings() replays them exactly.
+    """
+    if not _is_rateable(match):
+        return False
+    checkpoints = {c.team_id: c for c in TeamRating.query.filter_by(match_id=match.id).all()}
+    home = checkpoints.get(match.home_team_id)
+    away = checkpoints.get(match.away_team_id)
+    if not home or not away:
+        return apply_match_rating(match, commit=commit)
+
+    home_after, away_after = rate_match(home.rating_before, away.rating_before, match.home_score, match.away_score)
+    for checkpoint, after in ((home, home_after), (away, away_after)):
+        shift = after - checkpoint.rating_after
+        if not shift:
+            continue
+        checkpoint.rating_after = after
+        later = TeamRating.query.filter(
+            TeamRating.team_id == checkpoint.team_id, TeamRating.sequence > checkpoint.sequence
+        ).all()
+        for row in later:
+            row.rating_before += shift
+            row.rating_after += shift
+
+    if commit:
+        db.session.commit()
+    return True
+
+
+def get_current_ratings():
+    latest = db.session.query(
+        TeamRating.team_id.label('team_id'),
+        func.max(TeamRating.sequence).label('sequence'),
+    ).group_by(TeamRating.team_id).subquery()
+
+    rows = db.session.query(Team, TeamRating).outerjoin(
+        latest, latest.c.team_id == Team.id
+    ).outerjoin(
+        TeamRating, (TeamRating.team_id == latest.c.team_id) & (TeamRating.sequence == latest.c.sequence)
+    ).all()
+
+    ratings = [
+        {
+            'team_id': team.id,
+            'name': team.name,
+            'country': team.country,
+            'rating': round(checkpoint.rating_after, 1) if checkpoint else INITIAL_RATING,
+            'matches_rated': checkpoint.sequence if checkpoint else 0,
+        }
+        for team, checkpoint in rows
+    ]
+    ratings.sort(key=lambda r: r['rating'], reverse=True)
+    for idx, row in enumerate(ratings, 1):
+        row['rank'] = idx
+    return ratings
+
+
+def get_rating_history(team):
+    checkpoints = TeamRating.query.filter_by(team_id=team.id).order_by(TeamRating.sequence).all()
+    opponents = {t.id: t.name for t in Team.query.all()}
+    return {
+        'team_id': team.id,
+        'name': team.name,
+        'initial_rating': INITIAL_RATING,
+        'history': [
+            {
+                'sequence': c.sequence,
+                'match_id': c.match_id,
+                'date': c.played_at.isoformat() if c.played_at else None,
+                'opponent': opponents.get(c.opponent_id),
+                'rating_before': round(c.rating_before, 1),
+                'rating_after': round(c.rating_after, 1),
+                'change': round(c.rating_after - c.rating_before, 1),
+            }
+            for c in checkpoints
+        ],
+    }
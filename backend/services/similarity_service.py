@@ -0,0 +1,117 @@
+"""
+Player similarity search.
+Builds a z-scored float32 feature matrix per position category once per data
+generation and answers top-K neighbours with a single matrix-vector product.
+"""
+
+import numpy as np
+
+from services.cache_service import get_cached
+from services.percentile_service import PLAYER_METRICS, load_player_metric_table
+
+
+SIMILARITY_FEATURES = [
+    'goals_per_90',
+    'assists_per_90',
+    'defensive_actions_per_90',
+    'efficiency_rating',
+    'pass_completion_rate',
+    'average_rating',
+    'shots_total',
+    'shots_on_target',
+    'tackles_overall',
+    'interceptions_overall',
+    'minutes_played_overall',
+]
+
+SIMILARITY_METRICS = ('cosine', 'euclidean')
+
+
+class SimilarityIndex:
+    """Normalized feature matrix for one position category"""
+
+    def __init__(self, ids, names, features):
+        self.ids = ids
+        self.names = names
+        self.row_of = {int(player_id): idx for idx, player_id in enumerate(ids)}
+
+        mean = features.mean(axis=0) if len(features) else 0
+        std = features.std(axis=0) if len(features) else 1
+        std = np.where(std > 0, std, 1.0)
+        self.matrix = ((features - mean) / std).astype(np.float32)
+
+        self.sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        norms = np.sqrt(self.sq_norms)
+        self.unit = self.matrix / np.where(norms > 0, norms, 1.0)[:, None]
+
+    def nearest(self, row, k=10, metric='cosine'):
+        """Return (row, score) pairs of the k closest players, excluding row itself"""
+        if metric == 'cosine':
+            # Higher is closer
+            scores = self.unit @ self.unit[row]
+            order_key = -scores
+        else:
+            # ||a - b||^2 = ||a||^2 - 2ab + ||b||^2, reusing the precomputed norms
+            sq_dist = self.sq_norms - 2 * (self.matrix @ self.matrix[row]) + self.sq_norms[row]
+            scores = np.sqrt(np.maximum(sq_dist, 0))
+            order_key = scores
+
+        order_key = order_key.astype(np.float64)
+        order_key[row] = np.inf
+        k = min(k, len(order_key) - 1)
+        if k <= 0:
+            return []
+
+        candidates = np.argpartition(order_key, k - 1)[:k]
+        candidates = candidates[np.argsort(order_key[candidates])]
+        return [(int(idx), float(scores[idx])) for idx in candidates]
+
+
+def get_similarity_index(category):
+    def build():
+        table = load_player_metric_table()
+        mask = table.categories == category
+        columns = [PLAYER_METRICS.index(feature) for feature in SIMILARITY_FEATURES]
+        rows = np.flatnonzero(mask)
+        return SimilarityIndex(
+            table.ids[rows],
+            [table.names[idx] for idx in rows],
+            table.values[np.ix_(rows, columns)],
+        )
+
+    return get_cached(("similarity_index", category), build)
+
+
+def find_similar_players(player_id, k=10, metric='cosine'):
+    """
+    Top-k most similar players within the player's position category.
+    Returns None when the player does not exist; raises ValueError for an
+    unknown metric.
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of: {', '.join(SIMILARITY_METRICS)}")
+
+    table = load_player_metric_table()
+    row = table.row_of.get(player_id)
+    if row is None:
+        return None
+
+    category = table.categories[row]
+    index = get_similarity_index(category)
+    neighbours = index.nearest(index.row_of[player_id], k, metric)
+
+    return {
+        'player_id': player_id,
+        'name': table.names[row],
+        'position_category': category,
+        'metric': metric,
+        'features': SIMILARITY_FEATURES,
+        'similar': [
+            {
+                'player_id': int(index.ids[idx]),
+                'name': index.names[idx],
+                ('similarity' if metric == 'cosine' else 'distance'): round(score, 4),
+            }
+            for idx, score in neighbours
+        ],
+    }
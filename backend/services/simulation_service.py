@@ -0,0 +1,183 @@
+"""
+Monte Carlo tournament simulator.
+Samples Poisson scorelines for every remaining fixture from team xG averages,
+vectorized over all simulations at once, and ranks each simulated table by
+points, goal difference and goals scored.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from extensions import db
+from models import Match, Team, TeamStatistics
+from services.cache_service import get_cached
+
+
+CHUNK_SIZE = 25_000
+POOL_THRESHOLD = 50_000
+MAX_SIMULATIONS = 1_000_000
+
+# Processes per server process for large runs; 0 (default) runs every chunk in-process.
+# Every gunicorn worker gets its own pool, so keep workers x this within the CPU count.
+POOL_WORKERS = int(os.getenv("SIMULATION_POOL_WORKERS", "0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process is multithreaded
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _simulate_chunk(base_points, base_gd, base_gf, home_idx, away_idx, lam_home, lam_away, n, seed):
+    """Simulate n tournaments; returns (position counts [team, position], summed points per team)"""
+    rng = np.random.default_rng(seed)
+    teams = len(base_points)
+    fixtures = len(home_idx)
+
+    points = np.broadcast_to(base_points, (n, teams)).astype(np.float64)
+    gd = np.broadcast_to(base_gd, (n, teams)).astype(np.float64)
+    gf = np.broadcast_to(base_gf, (n, teams)).astype(np.float64)
+
+    if fixtures:
+        home_goals = rng.poisson(lam_home, size=(n, fixtures)).astype(np.float64)
+        away_goals = rng.poisson(lam_away, size=(n, fixtures)).astype(np.float64)
+
+        # Fixture -> team incidence matrices turn per-fixture results into table deltas with one matmul each
+        home_of = np.zeros((fixtures, teams))
+        home_of[np.arange(fixtures), home_idx] = 1
+        away_of = np.zeros((fixtures, teams))
+        away_of[np.arange(fixtures), away_idx] = 1
+
+        diff = home_goals - away_goals
+        home_points = np.where(diff > 0, 3.0, np.where(diff == 0, 1.0, 0.0))
+        away_points = np.where(diff < 0, 3.0, np.where(diff == 0, 1.0, 0.0))
+
+        points += home_points @ home_of + away_points @ away_of
+        gd += diff @ home_of - diff @ away_of
+        gf += home_goals @ home_of + away_goals @ away_of
+
+    # Remaining ties are broken by a random draw, like a drawing of lots
+    lots = rng.random((n, teams))
+    order = np.lexsort((lots, -gf, -gd, -points), axis=-1)
+
+    positions = np.broadcast_to(np.arange(teams), (n, teams))
+    counts = np.bincount((order * teams + positions).ravel(), minlength=teams * teams)
+    return counts.reshape(teams, teams), points.sum(axis=0)
+
+
+def _load_tournament():
+    teams = db.session.query(Team, TeamStatistics).outerjoin(
+        TeamStatistics, TeamStatistics.team_id == Team.id
+    ).order_by(Team.id).all()
+    index_of = {team.id: idx for idx, (team, _) in enumerate(teams)}
+
+    count = len(teams)
+    base_points = np.zeros(count)
+    base_gd = np.zeros(count)
+    base_gf = np.zeros(count)
+    remaining = []
+    goals_total = 0
+    played = 0
+
+    for match in Match.query.all():
+        home = index_of.get(match.home_team_id)
+        away = index_of.get(match.away_team_id)
+        if home is None or away is None:
+            continue
+        if match.home_score is None or match.away_score is None:
+            remaining.append((home, away))
+            continue
+
+        base_gf[home] += match.home_score
+        base_gf[away] += match.away_score
+        base_gd[home] += match.home_score - match.away_score
+        base_gd[away] += match.away_score - match.home_score
+        if match.home_score > match.away_score:
+            base_points[home] += 3
+        elif match.home_score < match.away_score:
+            base_points[away] += 3
+        else:
+            base_points[home] += 1
+            base_points[away] += 1
+        goals_total += match.home_score + match.away_score
+        played += 1
+
+    # Teams without xG fall back to the league scoring rate per side
+    fallback = goals_total / (2 * played) if played else 1.2
+    xg_for = np.array([(stats.xg_for_avg if stats else 0) or fallback for _, stats in teams])
+    xg_against = np.array([(stats.xg_against_avg if stats else 0) or fallback for _, stats in teams])
+
+    home_idx = np.array([h for h, _ in remaining], dtype=np.int64)
+    away_idx = np.array([a for _, a in remaining], dtype=np.int64)
+    lam_home = (xg_for[home_idx] + xg_against[away_idx]) / 2
+    lam_away = (xg_for[away_idx] + xg_against[home_idx]) / 2
+
+    return teams, base_points, base_gd, base_gf, home_idx, away_idx, lam_home, lam_away
+
+
+def run_simulation(n=10_000, seed=None):
+    """
+    Simulate the rest of the tournament n times.
+    The result depends only on (n, seed), not on how chunks are spread over workers.
+    Raises ValueError for a negative seed.
+    """
+    if seed is not None and seed < 0:
+        raise ValueError("seed must be a non-negative integer")
+    n = max(1, min(int(n), MAX_SIMULATIONS))
+    teams, base_points, base_gd, base_gf, home_idx, away_idx, lam_home, lam_away = _load_tournament()
+    fixture_args = (base_points, base_gd, base_gf, home_idx, away_idx, lam_home, lam_away)
+
+    sizes = [CHUNK_SIZE] * (n // CHUNK_SIZE)
+    if n % CHUNK_SIZE:
+        sizes.append(n % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if POOL_WORKERS > 0 and n >= POOL_THRESHOLD and len(sizes) > 1:
+        pool = _get_pool()
+        futures = [pool.submit(_simulate_chunk, *fixture_args, size, child) for size, child in zip(sizes, seeds)]
+        results = [future.result() for future in futures]
+    else:
+        results = [_simulate_chunk(*fixture_args, size, child) for size, child in zip(sizes, seeds)]
+
+    counts = sum(result[0] for result in results)
+    points_sum = sum(result[1] for result in results)
+    probabilities = counts / n
+    expected_position = probabilities @ np.arange(1, len(teams) + 1)
+
+    table = []
+    for idx, (team, _) in enumerate(teams):
+        table.append({
+            'team_id': team.id,
+            'name': team.name,
+            'country': team.country,
+            'current_points': int(base_points[idx]),
+            'expected_points': round(float(points_sum[idx] / n), 2),
+            'expected_position': round(float(expected_position[idx]), 2),
+            'most_likely_position': int(np.argmax(probabilities[idx])) + 1,
+            'position_probabilities': [round(float(p), 4) for p in probabilities[idx]],
+        })
+    table.sort(key=lambda row: row['expected_position'])
+
+    return {
+        'simulations': n,
+        'seed': seed,
+        'remaining_fixtures': len(home_idx),
+        'teams': table,
+    }
+
+
+def get_simulation(n=10_000, seed=None):
+    """Seeded simulations are deterministic, so they are cached per data generation"""
+    if seed is None:
+        return run_simulation(n, seed)
+    return get_cached(("simulation", int(n), int(seed)), lambda: run_simulation(n, seed))
@@ -1,159 +1,646 @@
+import json
 import os
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, wait
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from sqlalchemy import func, insert as sql_insert, literal, update as sql_update
+from sqlalchemy.dialects import postgresql, sqlite
 
-BASE_URL = "https://www.thesportsdb.com/api/v1/json/3"
+from extensions import db
+from models import Match, Player, SyncState, Team
+from services.cache_service import bump_generation
+from services.http_cache_service import http_cache
+
+BASE_URL = os.getenv("SPORTSDB_BASE_URL", "https://www.thesportsdb.com/api/v1/json/3")
 LEAGUE_ID = os.getenv("SPORTSDB_LEAGUE_ID", "5105")
 SEASON = os.getenv("SPORTSDB_SEASON", "2021")
 
+# Concurrency cap and API quota for batch fetches (the free tier allows 30 requests/minute)
+MAX_WORKERS = int(os.getenv("SPORTSDB_MAX_WORKERS", "8"))
+RATE_PER_MINUTE = float(os.getenv("SPORTSDB_RATE_PER_MINUTE", "30"))
+RATE_BURST = int(os.getenv("SPORTSDB_RATE_BURST", "5"))
+REQUEST_TIMEOUT = float(os.getenv("SPORTSDB_REQUEST_TIMEOUT", "10"))
+BATCH_DEADLINE = float(os.getenv("SPORTSDB_BATCH_DEADLINE", "120"))
+
+# Consecutive failures that open the circuit, and how long it stays open before a trial request
+BREAKER_FAILURES = int(os.getenv("SPORTSDB_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("SPORTSDB_BREAKER_RESET_SECONDS", "60"))
+
 session = requests.Session()
 
-retries = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[500, 502, 503, 504],
-)
+# Size the connection pool for the worker threads sharing this session. No
+# transport retries: their backoff would overrun the caller's deadline, and
+# failures are handled by the circuit breaker and the cached fallback instead.
+adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
 
-session.mount("https://", HTTPAdapter(max_retries=retries))
 
-def fetch_matches():
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` banked"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to timeout seconds; returns False if none came in time"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_for = min(wait_for, remaining)
+            time.sleep(wait_for)
+
+
+rate_limiter = TokenBucket(RATE_PER_MINUTE / 60.0, RATE_BURST)
+
+
+class FetchError(Exception):
+    """Raised when a rate-limited request cannot complete before its deadline"""
+
+
+class CircuitOpenError(FetchError):
+    """Raised instead of calling SportsDB while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open fails
+    fast for `reset_timeout` seconds, then lets one trial call through
+    (half-open) whose outcome closes or re-opens the circuit.
+    """
+
+    STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self.stale_served = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Claim permission for one call; False means fail fast"""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'closed' or (self.state == 'half_open' and not self._trial_running):
+                self._trial_running = self.state == 'half_open'
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about upstream health (e.g. a local deadline)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_stale(self):
+        with self._lock:
+            self.stale_served += 1
+
+    def export_state(self):
+        """State and counters to persist; opened_at becomes wall-clock time"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'opened_at': time.time() - (time.monotonic() - self.opened_at) if self.opened_at is not None else None,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'stale_served': self.stale_served,
+            }
+
+    def restore_state(self, data):
+        with self._lock:
+            self.state = data['state']
+            self.failures = data['failures']
+            self.opened_at = (
+                time.monotonic() - (time.time() - data['opened_at']) if data['opened_at'] is not None else None
+            )
+            self.times_opened = data['times_opened']
+            self.rejected = data['rejected']
+            self.stale_served = data['stale_served']
+            self._trial_running = False
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'state_code': self.STATES[self.state],
+                'consecutive_failures': self.failures,
+                'open_for_seconds': round(time.monotonic() - self.opened_at, 1) if self.state == 'open' else 0,
+                'times_opened': self.times_opened,
+                'rejected_calls': self.rejected,
+                'stale_responses_served': self.stale_served,
+            }
+
+
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+
+BREAKER_RESOURCE = 'breaker'
+
+
+def load_breaker_state():
+    """Resume the breaker from the state the last sync runner persisted, in any process"""
+    state = SyncState.query.filter_by(resource=BREAKER_RESOURCE).first()
+    if state and state.breaker_state:
+        breaker.restore_state(json.loads(state.breaker_state))
+
+
+def save_breaker_state():
+    SyncState.get(BREAKER_RESOURCE).breaker_state = json.dumps(breaker.export_state())
+    db.session.commit()
+
+
+def breaker_metrics():
+    """Metrics of the persisted breaker state, or of this process's breaker before any sync"""
+    state = SyncState.query.filter_by(resource=BREAKER_RESOURCE).first()
+    if not state or not state.breaker_state:
+        return breaker.metrics()
+    persisted = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+    persisted.restore_state(json.loads(state.breaker_state))
+    return persisted.metrics()
+
+
+def _is_upstream_failure(error):
+    """Errors that say SportsDB is unhealthy; other 4xx mean it answered"""
+    if isinstance(error, FetchError):
+        return False
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return True
+
+
+def _url(path):
+    return f"{BASE_URL}/{path}"
+
+
+def _get_json(path, deadline=None):
+    """
+    GET BASE_URL/path through the HTTP cache, circuit breaker and shared
+    rate limiter, bounded by an absolute monotonic deadline. Fresh cache
+    entries cost no request; stale ones are revalidated with a conditional
+    GET. While the circuit is open, or when the upstream call fails, the last
+    good cached payload is served instead if there is one.
+    """
+    url = _url(path)
+    cached = http_cache.get(url)
+    if http_cache.is_fresh(cached):
+        return json.loads(cached['body']) or {}
+
+    if not breaker.allow():
+        if cached:
+            breaker.record_stale()
+            return json.loads(cached['body']) or {}
+        raise CircuitOpenError("SportsDB circuit is open")
+
     try:
-        url = f"{BASE_URL}/eventsseason.php?id={LEAGUE_ID}&s={SEASON}"
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("events", []) or []
+        entry = _request(url, cached, deadline)
     except Exception as e:
-        print("SportsDB API error:", e)
-        return []
+        if _is_upstream_failure(e):
+            breaker.record_failure()
+            if cached:
+                print(f"SportsDB unavailable ({type(e).__name__}), serving cached {url}")
+                breaker.record_stale()
+                return json.loads(cached['body']) or {}
+        elif isinstance(e, requests.HTTPError):
+            breaker.record_success()
+        else:
+            breaker.release()
+        raise
+    breaker.record_success()
+    return json.loads(entry['body']) or {}
 
-def fetch_raw_seasons():
-    url = f"{BASE_URL}/search_all_seasons.php?id={LEAGUE_ID}"
-    response = session.get(url, timeout=10)
+
+def _request(url, cached, deadline):
+    timeout = REQUEST_TIMEOUT
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not rate_limiter.acquire(timeout=remaining):
+            raise FetchError("deadline exceeded waiting for rate limit")
+        timeout = min(timeout, max(deadline - time.monotonic(), 0.001))
+    else:
+        rate_limiter.acquire()
+
+    response = session.get(url, timeout=timeout, headers=http_cache.conditional_headers(cached))
+    if response.status_code == 304 and cached:
+        return http_cache.revalidated(url, cached, response)
     response.raise_for_status()
-    return response.json()
+    # Validate before caching so a broken body never becomes the fallback
+    response.json()
+    return http_cache.store(url, response)
+
+
+def fetch_concurrently(fetch, keys, max_workers=None, deadline=None):
+    """
+    Run fetch(key, deadline) for every key on a bounded thread pool.
+    Returns (results, errors): results maps key -> value for the calls that
+    succeeded, errors maps key -> message for those that failed or were still
+    pending when the overall deadline (seconds from now) ran out.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}, {}
+    batch_deadline = time.monotonic() + (BATCH_DEADLINE if deadline is None else deadline)
+
+    results = {}
+    errors = {}
+    executor = ThreadPoolExecutor(max_workers=min(max_workers or MAX_WORKERS, len(keys)),
+                                  thread_name_prefix="sportsdb")
+    try:
+        futures = {executor.submit(fetch, key, batch_deadline): key for key in keys}
+        done, pending = wait(futures, timeout=max(batch_deadline - time.monotonic(), 0))
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = f"{type(e).__name__}: {e}"
+        for future in pending:
+            future.cancel()
+            errors[futures[future]] = "deadline exceeded"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, errors
+
+MATCHES_PATH = f"eventsseason.php?id={LEAGUE_ID}&s={SEASON}"
+RECENT_MATCHES_PATH = f"eventspastleague.php?id={LEAGUE_ID}"
+TEAMS_PATH = f"lookup_all_teams.php?id={LEAGUE_ID}"
+
+
+def _players_path(team_api_id):
+    return f"lookup_all_players.php?id={team_api_id}"
+
+
+def fetch_matches():
+    return _get_json(MATCHES_PATH).get("events", []) or []
+
+def fetch_recent_matches():
+    """The league's most recently played events (a short window, not the whole season)"""
+    return _get_json(RECENT_MATCHES_PATH).get("events") or []
+
+def fetch_raw_seasons():
+    return _get_json(f"search_all_seasons.php?id={LEAGUE_ID}")
+
+
+UPSERT_BATCH_SIZE = 500
+
+
+def _upsert(model, rows, key, update):
+    """
+    INSERT ... ON CONFLICT (key) DO UPDATE in batches of UPSERT_BATCH_SIZE.
+    update maps column -> expression built from the `excluded` pseudo-table.
+    """
+    insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(db.engine.dialect.name)
+    if insert is None:
+        _upsert_generic(model, rows, key, update)
+        return
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(index_elements=[key], set_=update(stmt.excluded))
+        db.session.execute(stmt)
+
+
+def _upsert_generic(model, rows, key, update):
+    """
+    Select-then-update/insert for dialects without ON CONFLICT. Existing rows
+    are updated one by one, with `excluded` standing for the row's new values;
+    the rest are inserted in batches.
+    """
+    columns = model.__table__.c
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        existing = {value for (value,) in db.session.query(key).filter(key.in_([row[key.key] for row in batch]))}
+
+        new_rows = []
+        for row in batch:
+            if row[key.key] not in existing:
+                new_rows.append(row)
+                continue
+            excluded = SimpleNamespace(**{
+                name: literal(value, type_=columns[name].type) for name, value in row.items()
+            })
+            db.session.execute(sql_update(model).where(key == row[key.key]).values(update(excluded)))
+        if new_rows:
+            db.session.execute(sql_insert(model).values(new_rows))
+
+
+def _latest_by_key(records, key):
+    """Drop records without a key; a key repeated in one payload keeps its last record"""
+    return {r[key]: r for r in records if r and isinstance(r, dict) and r.get(key)}
+
+
+def _score(value):
+    return int(value) if value not in (None, "") else None
 
-from models import Match
-from extensions import db
 
 def save_matches_to_db(matches, season="2021"):
-    saved_count = 0
-    for m in matches:
-        if not m.get("idEvent"):
-            continue
+    matches = _latest_by_key(matches, "idEvent")
+    # event_id -> stored (home_score, away_score), to find results that changed
+    existing = {
+        event_id: (home_score, away_score)
+        for event_id, home_score, away_score in db.session.query(
+            Match.event_id, Match.home_score, Match.away_score
+        ).filter(Match.event_id.in_(list(matches)))
+    } if matches else {}
+    team_ids = dict(db.session.query(Team.name, Team.id).all())
 
-        exists = Match.query.filter_by(event_id=m["idEvent"]).first()
-        if exists:
-            # Update existing match with new data
-            exists.date = m.get("dateEvent", exists.date)
-            exists.home_score = m.get("intHomeScore", exists.home_score)
-            exists.away_score = m.get("intAwayScore", exists.away_score)
-            exists.venue = m.get("strVenue", exists.venue)
-            db.session.merge(exists)
-        else:
-            # Create new match
-            home_team = Team.query.filter_by(name=m.get("strHomeTeam")).first()
-            away_team = Team.query.filter_by(name=m.get("strAwayTeam")).first()
-
-            match = Match(
-                event_id=m["idEvent"],
-                season=season,
-                date=m.get("dateEvent"),
-                home_team=m.get("strHomeTeam"),
-                away_team=m.get("strAwayTeam"),
-                home_team_id=home_team.id if home_team else None,
-                away_team_id=away_team.id if away_team else None,
-                home_score=m.get("intHomeScore"),
-                away_score=m.get("intAwayScore"),
-                venue=m.get("strVenue"),
-            )
-            db.session.add(match)
-            saved_count += 1
+    rows = []
+    for event_id, m in matches.items():
+        home_id = team_ids.get(m.get("strHomeTeam"))
+        away_id = team_ids.get(m.get("strAwayTeam"))
+        # Same unordered pair key as Match.update_pair_key
+        paired = bool(home_id and away_id)
+        rows.append({
+            'event_id': event_id,
+            'season': season,
+            'date': m.get("dateEvent"),
+            'home_team': m.get("strHomeTeam"),
+            'away_team': m.get("strAwayTeam"),
+            'home_team_id': home_id,
+            'away_team_id': away_id,
+            'home_score': _score(m.get("intHomeScore")),
+            'away_score': _score(m.get("intAwayScore")),
+            'venue': m.get("strVenue"),
+            'stage': m.get("strGroup") or None,
+            'pair_low_team_id': min(home_id, away_id) if paired else None,
+            'pair_high_team_id': max(home_id, away_id) if paired else None,
+        })
 
+    # Existing matches keep their teams, season and (when the feed has none) stage
+    _upsert(Match, rows, Match.event_id, lambda excluded: {
+        'date': excluded.date,
+        'home_score': excluded.home_score,
+        'away_score': excluded.away_score,
+        'venue': excluded.venue,
+        'stage': func.coalesce(excluded.stage, Match.stage),
+    })
     db.session.commit()
-    return saved_count
 
+    # New and corrected results move team statistics and ratings by the
+    # difference, as a live result does
+    from services.live_ingestion_service import apply_team_result
+    from services.rating_service import apply_match_rating, correct_match_rating, rebuild_ratings
+    changed = False
+    cleared = False
+    for match in Match.query.filter(Match.event_id.in_(list(matches))).all():
+        before = existing.get(match.event_id, (None, None))
+        after = (match.home_score, match.away_score)
+        if before == after:
+            continue
+        changed = True
+        if match.home_team_id and match.away_team_id:
+            if None not in before:
+                apply_team_result(match.home_team_id, before[0], before[1], -1)
+                apply_team_result(match.away_team_id, before[1], before[0], -1)
+            if None not in after:
+                apply_team_result(match.home_team_id, after[0], after[1], 1)
+                apply_team_result(match.away_team_id, after[1], after[0], 1)
+        if None in after:
+            cleared = True
+        elif None in before:
+            apply_match_rating(match, commit=False)
+        else:
+            correct_match_rating(match, commit=False)
+    if cleared:
+        # A withdrawn result leaves a gap in the checkpoint chain; replay it
+        rebuild_ratings(commit=False)
+    db.session.commit()
 
-def fetch_teams():
-    url = f"{BASE_URL}/lookup_all_teams.php?id={LEAGUE_ID}"
-    response = session.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json().get("teams", []) or []
+    if changed:
+        from services.standings_service import rebuild_standings
+        rebuild_standings()
 
-from models import Team
+    return len(matches.keys() - existing.keys())
 
-def save_teams_to_db(teams):
-    saved_count = 0
-    for t in teams:
-        if not t.get("idTeam"):
-            continue
 
-        exists = Team.query.filter_by(team_id=t["idTeam"]).first()
-        if exists:
-            # Update existing team with new data
-            exists.name = t.get("strTeam", exists.name)
-            exists.country = t.get("strCountry", exists.country)
-            if t.get("strBadge"):  # Only update badge if provided
-                exists.badge = t.get("strBadge")
-            db.session.merge(exists)
-        else:
-            # Create new team
-            team = Team(
-                team_id=t["idTeam"],
-                name=t.get("strTeam"),
-                country=t.get("strCountry"),
-                badge=t.get("strBadge"),
-            )
-            db.session.add(team)
-        saved_count += 1
+def fetch_teams():
+    return _get_json(TEAMS_PATH).get("teams", []) or []
+
+def save_teams_to_db(teams):
+    teams = _latest_by_key(teams, "idTeam")
+    rows = [
+        {
+            'team_id': team_id,
+            'name': t.get("strTeam"),
+            'country': t.get("strCountry"),
+            'badge': t.get("strBadge") or None,
+        }
+        for team_id, t in teams.items()
+    ]
 
+    # Only replace the badge when the feed provides one
+    _upsert(Team, rows, Team.team_id, lambda excluded: {
+        'name': excluded.name,
+        'country': excluded.country,
+        'badge': func.coalesce(excluded.badge, Team.badge),
+    })
     db.session.commit()
-    return saved_count
+    return len(rows)
+
+def _fetch_team_players(team_api_id, deadline=None):
+    return _get_json(_players_path(team_api_id), deadline).get("player") or []
+
 
 def fetch_players_by_team(team_api_id):
     try:
-        url = f"{BASE_URL}/lookup_all_players.php?id={team_api_id}"
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("player") or []
+        return _fetch_team_players(team_api_id)
     except Exception as e:
         print(f"Error fetching players for team {team_api_id}:", e)
         return []
 
 
-from models import Player
-from extensions import db
+def fetch_players_for_teams(team_api_ids, max_workers=None, deadline=None):
+    """
+    Fetch the squads of many teams concurrently.
+    Returns (players_by_team, errors), both keyed by SportsDB team id; one
+    failing team does not abort the others.
+    """
+    players, errors = fetch_concurrently(_fetch_team_players, team_api_ids, max_workers, deadline)
+    for team_api_id, message in errors.items():
+        print(f"Error fetching players for team {team_api_id}: {message}")
+    return players, errors
+
 
 def save_players_to_db(players, team):
-    saved_count = 0
-    for p in players:
-        if not p or not isinstance(p, dict) or not p.get("idPlayer"):
-            continue
+    players = _latest_by_key(players, "idPlayer")
+    existing = {player_id for (player_id,) in db.session.query(Player.player_id).filter(
+        Player.player_id.in_(list(players))
+    )} if players else set()
 
-        exists = Player.query.filter_by(player_id=p["idPlayer"]).first()
-        if exists:
-            # Update existing player
-            exists.name = p.get("strPlayer", exists.name)
-            exists.position = p.get("strPosition", exists.position)
-            exists.nationality = p.get("strNationality", exists.nationality)
-            exists.date_of_birth = p.get("dateBorn", exists.date_of_birth)
-            exists.height = p.get("strHeight", exists.height)
-            db.session.merge(exists)
-        else:
-            # Create new player
-            player = Player(
-                player_id=p["idPlayer"],
-                name=p.get("strPlayer"),
-                position=p.get("strPosition"),
-                nationality=p.get("strNationality"),
-                date_of_birth=p.get("dateBorn"),
-                height=p.get("strHeight"),
-                team_id=team.id,
-            )
-            db.session.add(player)
-            saved_count += 1
+    rows = [
+        {
+            'player_id': player_id,
+            'name': p.get("strPlayer"),
+            'position': p.get("strPosition"),
+            'nationality': p.get("strNationality"),
+            'date_of_birth': p.get("dateBorn"),
+            'height': p.get("strHeight"),
+            'team_id': team.id,
+        }
+        for player_id, p in players.items()
+    ]
 
+    # Existing players keep their team assignment
+    _upsert(Player, rows, Player.player_id, lambda excluded: {
+        'name': excluded.name,
+        'position': excluded.position,
+        'nationality': excluded.nationality,
+        'date_of_birth': excluded.date_of_birth,
+        'height': excluded.height,
+    })
     db.session.commit()
-    return saved_count
+    return len(players.keys() - existing)
+
+
+def _save_if_changed(resource, path, save):
+    """
+    Run save() unless the payload cached for path is the one last applied to
+    resource, recording the run in its SyncState. Returns the saved count, or
+    None when the payload was unchanged.
+    """
+    state = SyncState.get(resource)
+    state.last_run_at = datetime.utcnow()
+    entry = http_cache.get(_url(path))
+    payload_hash = entry['content_hash'] if entry else None
+
+    count = None
+    if payload_hash is None or payload_hash != state.last_payload_hash:
+        count = save()
+        state.last_payload_hash = payload_hash
+    state.last_success_at = datetime.utcnow()
+    db.session.commit()
+    if count is not None:
+        # Cached payloads and pre-encoded responses are built from these tables
+        bump_generation()
+    return count
+
+
+def _completed_matchday():
+    """Latest match date before which every known match has a result"""
+    from services.db_data_service import parse_match_date
+
+    played = []
+    open_dates = []
+    for date, home_score, away_score in db.session.query(Match.date, Match.home_score, Match.away_score):
+        played_at = parse_match_date(date)
+        if played_at:
+            scored = home_score is not None and away_score is not None
+            (played if scored else open_dates).append(played_at.date())
+
+    first_open = min(open_dates) if open_dates else None
+    completed = [d for d in played if first_open is None or d < first_open]
+    return max(completed).isoformat() if completed else None
+
+
+def _fetch_match_updates(cursor):
+    """
+    Events newer than the cursor matchday from the recent-events window, or
+    the whole season when there is no cursor yet or the window does not reach
+    back to it. Returns (path, events).
+    """
+    if cursor:
+        recent = fetch_recent_matches()
+        dates = [e["dateEvent"] for e in recent if e.get("dateEvent")]
+        if dates and min(dates) <= cursor:
+            return RECENT_MATCHES_PATH, [e for e in recent if (e.get("dateEvent") or "") > cursor]
+    return MATCHES_PATH, fetch_matches()
+
+
+def sync_league(max_workers=None, deadline=None, incremental=True, renew_lease=None):
+    """
+    Refresh teams, squads and matches from SportsDB.
+    Squads are fetched concurrently under the shared rate limit; per-team
+    failures are collected in the returned summary instead of aborting the sync.
+    Payloads whose content hash was already applied skip the database save,
+    and incremental runs only fetch events after the last completed matchday.
+    renew_lease, when given, is called between phases to extend the runner lease.
+    """
+    renew_lease = renew_lease or (lambda: None)
+    unchanged = []
+
+    teams = fetch_teams()
+    teams_saved = _save_if_changed('teams', TEAMS_PATH, lambda: save_teams_to_db(teams))
+    if teams_saved is None:
+        unchanged.append('teams')
+
+    by_api_id = {team.team_id: team for team in Team.query.filter(
+        Team.team_id.in_([t["idTeam"] for t in teams if t.get("idTeam")])
+    ).all()}
+    renew_lease()
+    squads, errors = fetch_players_for_teams(list(by_api_id), max_workers, deadline)
+    renew_lease()
+
+    players_saved = 0
+    for team_api_id, players in squads.items():
+        resource = f"players:{team_api_id}"
+        saved = _save_if_changed(
+            resource, _players_path(team_api_id),
+            lambda: save_players_to_db(players, by_api_id[team_api_id]),
+        )
+        if saved is None:
+            unchanged.append(resource)
+        players_saved += saved or 0
+
+    renew_lease()
+    matches_state = SyncState.get('matches')
+    path, matches = _fetch_match_updates(matches_state.cursor if incremental else None)
+    matches_saved = _save_if_changed('matches', path, lambda: save_matches_to_db(matches, season=SEASON))
+    if matches_saved is None:
+        unchanged.append('matches')
+
+    matches_state = SyncState.get('matches')
+    matches_state.cursor = _completed_matchday()
+    db.session.commit()
+
+    return {
+        'teams': teams_saved or 0,
+        'players': players_saved,
+        'matches': matches_saved or 0,
+        'matches_fetched': len(matches),
+        'cursor': matches_state.cursor,
+        'unchanged': unchanged,
+        'errors': errors,
+    }
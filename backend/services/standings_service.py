@@ -0,0 +1,237 @@
+"""
+Standings engine.
+Tables are computed from match results (points, goal difference, goals
+scored, then head-to-head among teams still level) and stored per stage in
+the standings table, so reading a table is one indexed query. New results are
+applied as deltas to the two teams involved and only that stage is re-ranked.
+"""
+
+from sqlalchemy import and_, case, func, literal, select, union_all
+
+from extensions import db
+from models import Match, Standing, Team
+
+
+OVERALL_STAGE = 'overall'
+
+
+def _team_perspectives():
+    """One row per (stage, team, match) from both sides of every scored match"""
+    scored = and_(
+        Match.home_score.isnot(None), Match.away_score.isnot(None),
+        Match.home_team_id.isnot(None), Match.away_team_id.isnot(None),
+    )
+    staged = and_(scored, Match.stage.isnot(None))
+
+    selects = []
+    for stage, condition in ((literal(OVERALL_STAGE), scored), (Match.stage, staged)):
+        selects.append(select(
+            stage.label('stage'), Match.home_team_id.label('team_id'),
+            Match.home_score.label('gf'), Match.away_score.label('ga'),
+        ).where(condition))
+        selects.append(select(
+            stage.label('stage'), Match.away_team_id.label('team_id'),
+            Match.away_score.label('gf'), Match.home_score.label('ga'),
+        ).where(condition))
+    return union_all(*selects).subquery()
+
+
+def _ranked_query():
+    rows = _team_perspectives()
+    agg = select(
+        rows.c.stage,
+        rows.c.team_id,
+        func.count().label('played'),
+        func.sum(case((rows.c.gf > rows.c.ga, 1), else_=0)).label('wins'),
+        func.sum(case((rows.c.gf == rows.c.ga, 1), else_=0)).label('draws'),
+        func.sum(case((rows.c.gf < rows.c.ga, 1), else_=0)).label('losses'),
+        func.sum(rows.c.gf).label('goals_for'),
+        func.sum(rows.c.ga).label('goals_against'),
+        func.sum(case((rows.c.ga == 0, 1), else_=0)).label('clean_sheets'),
+    ).group_by(rows.c.stage, rows.c.team_id).subquery()
+
+    points = agg.c.wins * 3 + agg.c.draws
+    goal_difference = agg.c.goals_for - agg.c.goals_against
+    return select(
+        agg,
+        func.rank().over(
+            partition_by=agg.c.stage,
+            order_by=(points.desc(), goal_difference.desc(), agg.c.goals_for.desc()),
+        ).label('rank'),
+    )
+
+
+def _head_to_head(team_ids, stage):
+    """Mini-table (points, goal difference, goals) from matches among the given teams"""
+    query = Match.query.filter(
+        Match.home_team_id.in_(team_ids),
+        Match.away_team_id.in_(team_ids),
+        Match.home_score.isnot(None),
+        Match.away_score.isnot(None),
+    )
+    if stage != OVERALL_STAGE:
+        query = query.filter(Match.stage == stage)
+
+    table = {team_id: [0, 0, 0] for team_id in team_ids}
+    for m in query.all():
+        for team_id, gf, ga in ((m.home_team_id, m.home_score, m.away_score), (m.away_team_id, m.away_score, m.home_score)):
+            table[team_id][0] += 3 if gf > ga else (1 if gf == ga else 0)
+            table[team_id][1] += gf - ga
+            table[team_id][2] += gf
+    return table
+
+
+def _base_key(row):
+    return (-row.points, -row.goal_difference, -row.goals_for)
+
+
+def _order(stage, rows, names, base_key=_base_key):
+    """
+    Sort a stage's rows by points, goal difference and goals scored (or by a
+    precomputed rank); teams still level are separated by their head-to-head
+    record, then by name.
+    """
+    rows = sorted(rows, key=base_key)
+    ordered = []
+    start = 0
+    while start < len(rows):
+        end = start + 1
+        while end < len(rows) and base_key(rows[end]) == base_key(rows[start]):
+            end += 1
+        tied = rows[start:end]
+        if len(tied) > 1:
+            h2h = _head_to_head([row.team_id for row in tied], stage)
+            tied.sort(key=lambda row: (
+                -h2h[row.team_id][0], -h2h[row.team_id][1], -h2h[row.team_id][2], names.get(row.team_id) or '',
+            ))
+        ordered.extend(tied)
+        start = end
+
+    for position, row in enumerate(ordered, 1):
+        row.position = position
+    return ordered
+
+
+def rebuild_standings(commit=True):
+    """Recompute every stage table from the match results"""
+    Standing.query.delete()
+
+    names = {team.id: team.name for team in Team.query.all()}
+    tables = {OVERALL_STAGE: {}}
+    ranks = {}
+    for row in db.session.execute(_ranked_query()).mappings():
+        ranks[(row['stage'], row['team_id'])] = row['rank']
+        standing = Standing(
+            stage=row['stage'],
+            team_id=row['team_id'],
+            played=row['played'],
+            wins=row['wins'],
+            draws=row['draws'],
+            losses=row['losses'],
+            goals_for=row['goals_for'],
+            goals_against=row['goals_against'],
+            clean_sheets=row['clean_sheets'],
+        )
+        standing.calculate_metrics()
+        tables.setdefault(row['stage'], {})[row['team_id']] = standing
+
+    # Every team appears in the overall table, even before its first result
+    for team_id in names:
+        if team_id not in tables[OVERALL_STAGE]:
+            tables[OVERALL_STAGE][team_id] = Standing(
+                stage=OVERALL_STAGE, team_id=team_id, played=0, wins=0, draws=0, losses=0,
+                goals_for=0, goals_against=0, clean_sheets=0,
+            ).calculate_metrics()
+
+    # Teams without results rank after everyone with one
+    unranked = len(names) + 1
+    for stage, table in tables.items():
+        ordered = _order(
+            stage, list(table.values()), names,
+            base_key=lambda row: ranks.get((row.stage, row.team_id), unranked),
+        )
+        db.session.add_all(ordered)
+
+    if commit:
+        db.session.commit()
+
+
+def _apply_delta(standing, goals_for, goals_against, sign):
+    standing.played = (standing.played or 0) + sign
+    standing.goals_for = (standing.goals_for or 0) + sign * goals_for
+    standing.goals_against = (standing.goals_against or 0) + sign * goals_against
+    if goals_for > goals_against:
+        standing.wins = (standing.wins or 0) + sign
+    elif goals_for == goals_against:
+        standing.draws = (standing.draws or 0) + sign
+    else:
+        standing.losses = (standing.losses or 0) + sign
+    if goals_against == 0:
+        standing.clean_sheets = (standing.clean_sheets or 0) + sign
+    standing.calculate_metrics()
+
+
+def apply_match_result(match, previous_score=None, commit=True):
+    """
+    Apply one match result to its stage and the overall table.
+    previous_score is the (home, away) score already counted for this match, if any.
+    """
+    if not match.home_team_id or not match.away_team_id:
+        return
+
+    names = {team.id: team.name for team in Team.query.all()}
+    stages = [OVERALL_STAGE] + ([match.stage] if match.stage else [])
+    for stage in stages:
+        table = {row.team_id: row for row in Standing.query.filter_by(stage=stage).all()}
+        for team_id in (match.home_team_id, match.away_team_id):
+            if team_id not in table:
+                table[team_id] = Standing(
+                    stage=stage, team_id=team_id, played=0, wins=0, draws=0, losses=0,
+                    goals_for=0, goals_against=0, clean_sheets=0,
+                )
+                db.session.add(table[team_id])
+
+        home = table[match.home_team_id]
+        away = table[match.away_team_id]
+        if previous_score and None not in previous_score:
+            _apply_delta(home, previous_score[0], previous_score[1], -1)
+            _apply_delta(away, previous_score[1], previous_score[0], -1)
+        if match.home_score is not None and match.away_score is not None:
+            _apply_delta(home, match.home_score, match.away_score, 1)
+            _apply_delta(away, match.away_score, match.home_score, 1)
+
+        # Flush so the head-to-head tiebreak sees this result
+        db.session.flush()
+        _order(stage, list(table.values()), names)
+
+    if commit:
+        db.session.commit()
+
+
+def get_stages():
+    stages = [row[0] for row in db.session.query(Standing.stage).distinct().all()]
+    return sorted(stages, key=lambda stage: (stage != OVERALL_STAGE, stage))
+
+
+def get_standings_table(stage=OVERALL_STAGE):
+    rows = db.session.query(Standing, Team).join(
+        Team, Team.id == Standing.team_id
+    ).filter(Standing.stage == stage).order_by(Standing.position).all()
+
+    return [
+        {
+            'position': standing.position,
+            'country': team.country,
+            'name': team.name,
+            'matches_played': standing.played,
+            'wins': standing.wins,
+            'draws': standing.draws,
+            'losses': standing.losses,
+            'goals_scored': standing.goals_for,
+            'goals_conceded': standing.goals_against,
+            'goal_difference': standing.goal_difference,
+            'clean_sheets': standing.clean_sheets,
+            'points': standing.points,
+        }
+        for standing, team in rows
+    ]
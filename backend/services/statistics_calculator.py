@@ -3,6 +3,8 @@ Statistics calculator - Computes derived metrics from player and team data.
 All metrics are calculated on-the-fly, not stored permanently.
 """
 
+import numpy as np
+
 from models import PlayerStatistics, TeamStatistics, Player, Team
 
 
@@ -119,6 +121,113 @@ class TeamStatsCalculator:
             "defensive_stability": TeamStatsCalculator.calculate_defensive_stability(team_stats),
         }
     
+    @staticmethod
+    def calculate_batch_metrics(teams: list) -> list:
+        """
+        Calculate analytics profiles for many teams in one vectorized pass
+        Takes (Team, TeamStatistics) pairs and applies the same thresholds as
+        calculate_attack_strength/calculate_defensive_stability column-wise.
+        """
+        if not teams:
+            return []
+
+        def column(attr):
+            return np.array([getattr(stats, attr) or 0 for _, stats in teams], dtype=np.float64)
+
+        def per(numerator, denominator, scale=1.0):
+            out = np.zeros_like(numerator)
+            np.divide(numerator * scale, denominator, out=out, where=denominator > 0)
+            return out
+
+        played = column("matches_played")
+        wins = column("wins")
+        draws = column("draws")
+        losses = column("losses")
+        scored = column("goals_scored")
+        conceded = column("goals_conceded")
+        clean_sheets = column("clean_sheets")
+        total_shots = column("total_shots")
+        on_target = column("shots_on_target")
+        possession = column("average_possession")
+        xg_for = column("xg_for_avg")
+        xg_against = column("xg_against_avg")
+
+        goals_per_match = per(scored, played)
+        goals_against_per_match = per(conceded, played)
+        clean_sheet_pct = per(clean_sheets, played, 100)
+        win_pct = per(wins, played, 100)
+        draw_pct = np.round(per(draws, played, 100), 1)
+        loss_pct = np.round(per(losses, played, 100), 1)
+        shot_accuracy = np.round(per(on_target, total_shots, 100), 1)
+        points = wins * 3 + draws
+        goal_difference = scored - conceded
+
+        attack = np.select([goals_per_match > 2.5, goals_per_match > 2.0, goals_per_match > 1.5], [40, 30, 20], 10)
+        attack = attack + np.select([xg_for > 1.8, xg_for > 1.5, xg_for > 1.2], [40, 30, 20], 10)
+        attack = np.minimum(attack / 2, 100)
+
+        defense = np.select(
+            [goals_against_per_match < 1.0, goals_against_per_match < 1.5, goals_against_per_match < 2.0],
+            [40, 30, 20], 10,
+        )
+        defense = defense + np.select([xg_against < 1.2, xg_against < 1.5, xg_against < 1.8], [40, 30, 20], 10)
+        defense = defense + np.select([clean_sheet_pct > 50, clean_sheet_pct > 30], [20, 10], 0)
+        defense = np.minimum(defense / 2.5, 100)
+
+        profiles = []
+        for i, (team, _) in enumerate(teams):
+            profiles.append({
+                "team_id": team.id,
+                "name": team.name,
+                "country": team.country,
+                "record": {
+                    "matches_played": int(played[i]),
+                    "wins": int(wins[i]),
+                    "draws": int(draws[i]),
+                    "losses": int(losses[i]),
+                    "points": int(points[i]),
+                },
+                "performance": {
+                    "win_percentage": round(float(win_pct[i]), 1),
+                    "draw_percentage": float(draw_pct[i]),
+                    "loss_percentage": float(loss_pct[i]),
+                },
+                "goals": {
+                    "goals_scored": int(scored[i]),
+                    "goals_conceded": int(conceded[i]),
+                    "goal_difference": int(goal_difference[i]),
+                    "goals_per_match": round(float(goals_per_match[i]), 2),
+                    "goals_against_per_match": round(float(goals_against_per_match[i]), 2),
+                },
+                "defense": {
+                    "clean_sheets": int(clean_sheets[i]),
+                    "clean_sheet_percentage": round(float(clean_sheet_pct[i]), 1),
+                },
+                "possession": {
+                    "average_possession": round(float(possession[i]), 1),
+                },
+                "shots": {
+                    "total_shots": int(total_shots[i]),
+                    "shots_on_target": int(on_target[i]),
+                    "shot_accuracy": float(shot_accuracy[i]),
+                },
+                "expected_goals": {
+                    "xg_for_avg": round(float(xg_for[i]), 2),
+                    "xg_against_avg": round(float(xg_against[i]), 2),
+                    "xg_difference": round(float(xg_for[i] - xg_against[i]), 2),
+                },
+                "attack_strength": {
+                    "score": round(float(attack[i]), 1),
+                    "rating": TeamStatsCalculator._get_strength_rating(float(attack[i])),
+                },
+                "defensive_stability": {
+                    "score": round(float(defense[i]), 1),
+                    "rating": TeamStatsCalculator._get_strength_rating(float(defense[i])),
+                },
+            })
+
+        return profiles
+    
     @staticmethod
     def calculate_draw_percentage(team_stats: TeamStatistics) -> float:
         """Calculate draw percentage"""
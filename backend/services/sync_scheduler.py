@@ -0,0 +1,151 @@
+"""
+Background scheduler for the incremental SportsDB sync.
+Every worker process may run the scheduler thread, but a lease on the
+'scheduler' sync_state row lets only one of them sync at a time. The runner
+renews the lease between sync phases, so a long sync never outlives it.
+Intervals are jittered so workers (and deployments) do not hit the API in
+lockstep.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import SyncState
+
+
+SYNC_INTERVAL = float(os.getenv("SPORTSDB_SYNC_INTERVAL", "0"))
+SYNC_JITTER = float(os.getenv("SPORTSDB_SYNC_JITTER", "0.2"))
+LOCK_TTL = float(os.getenv("SPORTSDB_SYNC_LOCK_TTL", "900"))
+
+LOCK_RESOURCE = 'scheduler'
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when another runner took over the lease while a sync was running"""
+
+
+_thread = None
+_thread_pid = None
+_start_lock = threading.Lock()
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def acquire_lock(owner, ttl=LOCK_TTL):
+    """Take the runner lease unless another live runner holds it"""
+    try:
+        SyncState.get(LOCK_RESOURCE)
+        db.session.commit()
+    except IntegrityError:
+        # Another worker created the row first
+        db.session.rollback()
+
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(SyncState)
+        .where(SyncState.resource == LOCK_RESOURCE)
+        .where(or_(SyncState.locked_until.is_(None), SyncState.locked_until < now, SyncState.locked_by == owner))
+        .values(locked_by=owner, locked_until=now + timedelta(seconds=ttl))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def renew_lock(owner, ttl=LOCK_TTL):
+    """Extend a lease this owner still holds; False when it has been taken over"""
+    result = db.session.execute(
+        update(SyncState)
+        .where(SyncState.resource == LOCK_RESOURCE, SyncState.locked_by == owner)
+        .values(locked_until=datetime.utcnow() + timedelta(seconds=ttl))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def release_lock(owner):
+    db.session.execute(
+        update(SyncState)
+        .where(SyncState.resource == LOCK_RESOURCE, SyncState.locked_by == owner)
+        .values(locked_by=None, locked_until=None)
+    )
+    db.session.commit()
+
+
+def run_sync(incremental=True):
+    """
+    Run one sync if no other runner holds the lease.
+    Returns the sync summary, or None when another runner is active.
+    """
+    from services.sportsdb_service import load_breaker_state, save_breaker_state, sync_league
+
+    owner = _owner()
+    if not acquire_lock(owner):
+        return None
+    # The breaker outlives the process: resume from the last runner's state
+    load_breaker_state()
+
+    def renew():
+        if not renew_lock(owner):
+            raise LeaseLostError("Sync lease expired and was taken over by another runner")
+
+    try:
+        result = sync_league(incremental=incremental, renew_lease=renew)
+        state = SyncState.get(LOCK_RESOURCE)
+        state.last_run_at = state.last_success_at = datetime.utcnow()
+        state.last_error = None
+        db.session.commit()
+        return result
+    except Exception as e:
+        db.session.rollback()
+        state = SyncState.get(LOCK_RESOURCE)
+        state.last_run_at = datetime.utcnow()
+        state.last_error = f"{type(e).__name__}: {e}"
+        db.session.commit()
+        raise
+    finally:
+        save_breaker_state()
+        release_lock(owner)
+
+
+def next_delay(interval=None):
+    interval = SYNC_INTERVAL if interval is None else interval
+    return interval * (1 + random.uniform(-SYNC_JITTER, SYNC_JITTER))
+
+
+def _run(app):
+    while True:
+        time.sleep(next_delay())
+        with app.app_context():
+            try:
+                result = run_sync()
+                if result is not None:
+                    print(f"🔄 SportsDB sync: {result['matches']} new matches, "
+                          f"{len(result['unchanged'])} unchanged, {len(result['errors'])} errors")
+            except Exception as e:
+                print(f"⚠️  SportsDB sync failed: {e}")
+            finally:
+                db.session.remove()
+
+
+def start_scheduler(app):
+    """Start the sync thread once per process when SPORTSDB_SYNC_INTERVAL is set"""
+    global _thread, _thread_pid
+    if SYNC_INTERVAL <= 0:
+        return False
+    with _start_lock:
+        # Threads do not survive fork, so a forked worker starts its own
+        if _thread is None or _thread_pid != os.getpid():
+            _thread = threading.Thread(target=_run, args=(app,), name="sportsdb-sync", daemon=True)
+            _thread.start()
+            _thread_pid = os.getpid()
+    return True
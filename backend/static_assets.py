@@ -0,0 +1,116 @@
+"""
+In-memory manifest of the frontend build.
+At startup every file under the frontend folder is read once, hashed and
+pre-compressed. Each asset is reachable by its plain name (revalidated through
+its ETag) and by a content-hashed name (cached as immutable); HTML pages are
+rewritten to reference the hashed names. Requests are answered from memory,
+including 304s, without touching the filesystem.
+"""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import Response
+
+from compression import compress_variants, negotiate_encoding
+
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+_REFERENCE = re.compile(r'''(\b(?:src|href)=)(["'])([^"'#?:]+)\2''')
+
+
+class Asset:
+    """One file's bytes, its compressed variants and validators"""
+
+    def __init__(self, path, body):
+        self.path = path
+        self.body = body
+        self.hash = hashlib.sha256(body).hexdigest()[:12]
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.variants = compress_variants(body)
+
+    @property
+    def hashed_path(self):
+        stem, ext = posixpath.splitext(self.path)
+        return f"{stem}.{self.hash}{ext}"
+
+    def response(self, request, immutable=False):
+        encoding = negotiate_encoding(request.accept_encodings, self.variants)
+        response = Response(self.variants[encoding] if encoding else self.body, mimetype=self.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        # Each encoding is a different representation, so it gets its own validator
+        response.set_etag(f"{self.hash}-{encoding}" if encoding else self.hash)
+        response.headers['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+        response.vary.add('Accept-Encoding')
+        return response.make_conditional(request)
+
+
+class StaticManifest:
+    """Maps plain and content-hashed URL paths to in-memory assets"""
+
+    def __init__(self, folder, index='index.html'):
+        self.folder = folder
+        self.routes = {}
+        self.index = None
+        self._build(index)
+
+    def _read_files(self):
+        files = {}
+        if not os.path.isdir(self.folder):
+            return files
+        for root, _dirs, names in os.walk(self.folder):
+            for name in names:
+                full = os.path.join(root, name)
+                rel = os.path.relpath(full, self.folder).replace(os.sep, '/')
+                with open(full, 'rb') as f:
+                    files[rel] = f.read()
+        return files
+
+    def _build(self, index):
+        files = self._read_files()
+        pages = {path for path in files if path.endswith(('.html', '.htm'))}
+
+        hashed = {}
+        for path in sorted(files.keys() - pages):
+            asset = Asset(path, files[path])
+            self.routes[path] = (asset, False)
+            self.routes[asset.hashed_path] = (asset, True)
+            hashed[path] = asset.hashed_path
+
+        for path in pages:
+            asset = Asset(path, self._rewrite(path, files[path], hashed))
+            self.routes[path] = (asset, False)
+
+        if index in self.routes:
+            self.index = self.routes[index][0]
+
+    @staticmethod
+    def _rewrite(page, body, hashed):
+        """Point src/href attributes at the absolute hashed URL of each known asset"""
+        base = posixpath.dirname(page)
+
+        def replace(match):
+            ref = match.group(3)
+            if ref.startswith('/'):
+                target = ref.lstrip('/')
+            else:
+                target = posixpath.normpath(posixpath.join(base, ref))
+            if target not in hashed:
+                return match.group(0)
+            # Absolute, so pages served through the index fallback at nested paths still resolve
+            return f"{match.group(1)}{match.group(2)}/{hashed[target]}{match.group(2)}"
+
+        return _REFERENCE.sub(replace, body.decode('utf-8')).encode('utf-8')
+
+    def lookup(self, path):
+        """(asset, immutable) for a URL path; unknown paths get the index page (SPA fallback)"""
+        found = self.routes.get(path)
+        if found:
+            return found
+        return (self.index, False) if self.index else (None, False)
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubSportsDB:
+    """Local HTTP server answering each path with a configured delay, status and JSON body"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.lstrip('/')
+                stub.requests.append(path)
+                delay, status, body = stub.routes.get(path, (0, 404, {}))
+                time.sleep(delay)
+                payload = json.dumps(body).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    # The client gave up first
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def route(self, path, body=None, status=200, delay=0):
+        self.routes[path] = (delay, status, body if body is not None else {})
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_sportsdb(monkeypatch, tmp_path):
+    """Point the SportsDB client at a stub server, with a fresh cache, breaker and rate limiter"""
+    from services import sportsdb_service
+    from services.http_cache_service import HttpCache
+
+    stub = StubSportsDB()
+    monkeypatch.setattr(sportsdb_service, 'BASE_URL', stub.url)
+    # min_ttl=0: every call reaches the stub (stale entries are revalidated)
+    monkeypatch.setattr(sportsdb_service, 'http_cache', HttpCache(str(tmp_path / 'http_cache'), min_ttl=0))
+    monkeypatch.setattr(sportsdb_service, 'breaker', sportsdb_service.CircuitBreaker(5, 60))
+    monkeypatch.setattr(sportsdb_service, 'rate_limiter', sportsdb_service.TokenBucket(1000, 1000))
+    yield stub
+    stub.close()
+
+
+
+@pytest.fixture
+def database_env(tmp_path, monkeypatch):
+    """Point the app at a fresh SQLite database, without background threads"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'football.db'}")
+    monkeypatch.setenv('SECRET_KEY', 'test')
+    monkeypatch.delenv('SPORTSDB_SYNC_INTERVAL', raising=False)
+
+
+@pytest.fixture
+def app(database_env):
+    """The app on a fresh database imported from the CSVs"""
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def upgrade_database(database_env):
+    """
+    Returns upgrade(*tables): imports the CSVs into a fresh database, drops the
+    given tables as a database created by an older release would lack them, then
+    starts the app on it again so the startup upgrade runs
+    """
+    from app import create_app
+    from extensions import db
+
+    def upgrade(*tables):
+        with create_app().app_context():
+            for name in tables:
+                db.metadata.tables[name].drop(db.engine)
+            db.engine.dispose()
+        return create_app()
+
+    return upgrade
@@ -0,0 +1,26 @@
+from models import Match
+from services.goal_timing_service import get_goal_histogram
+from services.rating_service import INITIAL_RATING, get_current_ratings
+
+
+def test_upgrade_rebuilds_ratings_from_stored_results(upgrade_database):
+    app = upgrade_database('team_ratings')
+
+    with app.app_context():
+        ratings = get_current_ratings()
+        scored = Match.query.filter(Match.home_score.isnot(None)).count()
+
+    assert sum(r['matches_rated'] for r in ratings) == 2 * scored
+    assert any(r['rating'] != INITIAL_RATING for r in ratings)
+
+
+def test_upgrade_backfills_goal_timings_from_csv(upgrade_database):
+    app = upgrade_database('match_goals')
+
+    with app.app_context():
+        histogram = get_goal_histogram(15)
+        scored = sum(m.home_score + m.away_score for m in Match.query.filter(Match.home_score.isnot(None)))
+
+    assert histogram['total_goals'] > 0
+    assert histogram['total_goals'] <= scored
+    assert sum(b['goals'] for b in histogram['buckets']) == histogram['total_goals']
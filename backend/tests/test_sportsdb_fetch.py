@@ -0,0 +1,88 @@
+import time
+
+import pytest
+import requests
+
+from services import sportsdb_service
+from services.sportsdb_service import FetchError, TokenBucket, fetch_concurrently
+
+
+def test_token_bucket_spends_burst_then_refills_at_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire(timeout=0)
+    assert time.monotonic() - started < 0.05
+
+    # The fourth token takes about 1/rate seconds to accrue
+    assert bucket.acquire(timeout=1)
+    assert 0.03 < time.monotonic() - started < 0.5
+
+
+def test_token_bucket_gives_up_at_timeout():
+    bucket = TokenBucket(rate=0.5, capacity=1)
+    assert bucket.acquire(timeout=0)
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.2)
+    assert time.monotonic() - started == pytest.approx(0.2, abs=0.1)
+
+
+def test_rate_limited_request_fails_when_token_arrives_after_deadline(stub_sportsdb, monkeypatch):
+    stub_sportsdb.route('teams', {'teams': []})
+    monkeypatch.setattr(sportsdb_service, 'rate_limiter', TokenBucket(rate=0.1, capacity=1))
+
+    assert sportsdb_service._get_json('teams', deadline=time.monotonic() + 1) == {'teams': []}
+    started = time.monotonic()
+    with pytest.raises(FetchError):
+        sportsdb_service._get_json('teams', deadline=time.monotonic() + 0.3)
+    assert time.monotonic() - started < 0.6
+    assert len(stub_sportsdb.requests) == 1
+
+
+def test_slow_upstream_is_abandoned_at_deadline(stub_sportsdb):
+    stub_sportsdb.route('slow', {'ok': True}, delay=3)
+
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        sportsdb_service._get_json('slow', deadline=time.monotonic() + 0.5)
+    assert time.monotonic() - started < 1.0
+
+
+def test_server_errors_are_not_retried_past_deadline(stub_sportsdb):
+    stub_sportsdb.route('broken', status=503)
+
+    started = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        sportsdb_service._get_json('broken', deadline=time.monotonic() + 2)
+    assert time.monotonic() - started < 0.5
+    assert stub_sportsdb.requests == ['broken']
+
+
+def test_fetch_concurrently_returns_partial_results_at_deadline(stub_sportsdb):
+    for team in ('1', '2', '3'):
+        stub_sportsdb.route(f'team{team}', {'team': team})
+    stub_sportsdb.route('team4', {'team': '4'}, delay=3)
+    stub_sportsdb.route('team5', status=404)
+
+    def fetch(key, deadline):
+        return sportsdb_service._get_json(f'team{key}', deadline)['team']
+
+    started = time.monotonic()
+    results, errors = fetch_concurrently(fetch, ['1', '2', '3', '4', '5'], max_workers=5, deadline=0.5)
+    assert time.monotonic() - started < 1.0
+
+    assert results == {'1': '1', '2': '2', '3': '3'}
+    assert set(errors) == {'4', '5'}
+    assert errors['5'].startswith('HTTPError')
+
+
+def test_fetch_concurrently_reports_keys_still_queued_at_deadline(stub_sportsdb):
+    for team in range(4):
+        stub_sportsdb.route(f'team{team}', {'team': team}, delay=0.4)
+
+    def fetch(key, deadline):
+        return sportsdb_service._get_json(f'team{key}', deadline)['team']
+
+    results, errors = fetch_concurrently(fetch, range(4), max_workers=2, deadline=0.6)
+    assert results == {0: 0, 1: 1}
+    assert set(errors) == {2, 3}
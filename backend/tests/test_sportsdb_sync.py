@@ -0,0 +1,43 @@
+from models import Standing, Team, TeamStatistics
+from services.rating_service import get_current_ratings, rebuild_ratings
+from services.sportsdb_service import save_matches_to_db
+
+
+def _event(home, away, home_score, away_score):
+    return {
+        'idEvent': '900001',
+        'dateEvent': '2030-01-01',
+        'strHomeTeam': home.name,
+        'strAwayTeam': away.name,
+        'intHomeScore': home_score,
+        'intAwayScore': away_score,
+        'strVenue': 'Stub Stadium',
+        'strGroup': 'Group Z',
+    }
+
+
+def _team_stats(team):
+    stats = TeamStatistics.query.filter_by(team_id=team.id).first()
+    return stats.matches_played, stats.wins, stats.losses, stats.goals_scored, stats.goals_conceded
+
+
+def test_resync_applies_a_corrected_score(app):
+    with app.app_context():
+        home, away = Team.query.order_by(Team.id).limit(2).all()
+        baseline = _team_stats(home), _team_stats(away)
+
+        assert save_matches_to_db([_event(home, away, '2', '0')]) == 1
+        assert save_matches_to_db([_event(home, away, '0', '1')]) == 0
+
+        played, wins, losses, scored, conceded = baseline[0]
+        assert _team_stats(home) == (played + 1, wins, losses + 1, scored, conceded + 1)
+        played, wins, losses, scored, conceded = baseline[1]
+        assert _team_stats(away) == (played + 1, wins + 1, losses, scored + 1, conceded)
+
+        standing = Standing.query.filter_by(stage='Group Z', team_id=home.id).one()
+        assert (standing.played, standing.wins, standing.losses, standing.points) == (1, 0, 1, 0)
+
+        # The corrected match is the latest for both teams, so the correction is exact
+        corrected = get_current_ratings()
+        rebuild_ratings()
+        assert corrected == get_current_ratings()